@@ -12,6 +12,11 @@ from config import Config
 from telegram_client import TelegramCopyTrader
 from paper_trader import PaperTrader  # Import the new paper trading module
 
+try:
+    import uvloop  # Optional faster event loop (not available on Windows)
+except ImportError:
+    uvloop = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -1185,6 +1190,9 @@ async def setup_bot():
 if __name__ == "__main__":
     try:
         clear_screen()  # Start with a clean screen
+        if uvloop is not None:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            logger.info("Using uvloop event loop")
         asyncio.run(setup_bot())
     except KeyboardInterrupt:
         clear_screen()
@@ -8,25 +8,78 @@ import os
 import time
 import logging
 import random
+import sys
+from dataclasses import dataclass, asdict, fields, replace
 from decimal import Decimal
-import uuid
-import traceback
+import secrets
 
 logger = logging.getLogger(__name__)
 
+FEE_RATE = 0.0025  # 0.25% fee per simulated trade
+_SEED_DIV = 1e10  # Scales the address-derived seed into a memecoin-sized price
+
+# dataclass(slots=True) is only available on Python 3.10+
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_OPTIONS)
+class PaperTradeRecord:
+    """
+    A single paper trade (buy or sell) in positions and trade history
+    
+    Optional fields are None until they apply and are left out of the
+    persisted JSON, so the file format matches the old dict records.
+    """
+    trade_id: str
+    token_address: str
+    token_name: str
+    entry_price: float
+    amount: float
+    value_usd: float
+    fee_usd: float
+    status: str
+    slippage: float
+    type: str
+    entry_time: float = None
+    stop_loss_price: float = None
+    take_profit_levels: list = None
+    related_trade_id: str = None
+    exit_time: float = None
+    exit_price: float = None
+    realized_pnl: float = None
+    pnl_percentage: float = None
+    holding_time: float = None
+    close_reason: str = None
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from its persisted dict form, ignoring unknown keys"""
+        return cls(**{key: value for key, value in data.items() if key in _RECORD_FIELDS})
+    
+    def to_dict(self):
+        """Convert to the persisted dict form, dropping fields that are not set"""
+        return {key: value for key, value in asdict(self).items() if value is not None}
+
+_RECORD_FIELDS = frozenset(f.name for f in fields(PaperTradeRecord))
+
 class PaperTrader:
     """
     Paper trading system for simulating trades without using real funds
     Tracks virtual balance, positions, and trading history
     """
     
+    __slots__ = (
+        'config', 'paper_trading_file', 'virtual_balance', 'positions', 'trade_history',
+        'started_at', '_price_seed_cache', 'trading_parameters', 'paused', 'auto_execution'
+    )
+    
     def __init__(self, config):
         self.config = config
         self.paper_trading_file = 'paper_trading.json'
         self.virtual_balance = 10000.0  # Default starting balance in USD
-        self.positions = {}  # Current open positions
-        self.trade_history = []  # History of all paper trades
+        self.positions = {}  # Current open positions (symbol -> PaperTradeRecord)
+        self.trade_history = []  # History of all paper trades (PaperTradeRecord)
         self.started_at = time.time()
+        self._price_seed_cache = {}  # token_address -> deterministic base price
         
         # Trading parameters
         self.trading_parameters = {
@@ -53,8 +106,11 @@ class PaperTrader:
                 with open(self.paper_trading_file, 'r') as f:
                     data = json.load(f)
                     self.virtual_balance = data.get('virtual_balance', self.virtual_balance)
-                    self.positions = data.get('positions', {})
-                    self.trade_history = data.get('trade_history', [])
+                    self.positions = {
+                        symbol: PaperTradeRecord.from_dict(position)
+                        for symbol, position in data.get('positions', {}).items()
+                    }
+                    self.trade_history = [PaperTradeRecord.from_dict(trade) for trade in data.get('trade_history', [])]
                     self.started_at = data.get('started_at', time.time())
                     self.trading_parameters = data.get('trading_parameters', self.trading_parameters)
                     self.paused = data.get('paused', False)
@@ -68,8 +124,8 @@ class PaperTrader:
         try:
             data = {
                 'virtual_balance': self.virtual_balance,
-                'positions': self.positions,
-                'trade_history': self.trade_history,
+                'positions': {symbol: position.to_dict() for symbol, position in self.positions.items()},
+                'trade_history': [trade.to_dict() for trade in self.trade_history],
                 'started_at': self.started_at,
                 'trading_parameters': self.trading_parameters,
                 'paused': self.paused,
@@ -77,9 +133,9 @@ class PaperTrader:
             }
             with open(self.paper_trading_file, 'w') as f:
                 json.dump(data, f, indent=2)
-            logger.info(f"Saved paper trading data - Balance: ${self.virtual_balance:.2f}")
+            logger.info("Saved paper trading data - Balance: $%.2f", self.virtual_balance)
         except Exception as e:
-            logger.error(f"Error saving paper trading data: {str(e)}")
+            logger.error("Error saving paper trading data: %s", e)
     
     def reset_account(self, initial_balance=10000.0):
         """Reset paper trading account to initial state"""
@@ -105,8 +161,8 @@ class PaperTrader:
         # Calculate total value (balance + open positions)
         open_positions_value = 0
         for symbol, position in self.positions.items():
-            current_price = self._get_current_price(position['token_address'])
-            position_value = position['amount'] * current_price
+            current_price = self._get_current_price(position.token_address)
+            position_value = position.amount * current_price
             open_positions_value += position_value
         
         total_value = self.virtual_balance + open_positions_value
@@ -114,10 +170,10 @@ class PaperTrader:
         # Calculate performance metrics
         profit_loss = 0
         if self.trade_history:
-            profit_loss = sum(trade['realized_pnl'] for trade in self.trade_history if 'realized_pnl' in trade)
+            profit_loss = sum(trade.realized_pnl for trade in self.trade_history if trade.realized_pnl is not None)
         
-        win_trades = len([t for t in self.trade_history if t.get('realized_pnl', 0) > 0])
-        loss_trades = len([t for t in self.trade_history if t.get('realized_pnl', 0) < 0])
+        win_trades = len([t for t in self.trade_history if (t.realized_pnl or 0) > 0])
+        loss_trades = len([t for t in self.trade_history if (t.realized_pnl or 0) < 0])
         total_trades = len(self.trade_history)
         win_rate = (win_trades / total_trades) * 100 if total_trades > 0 else 0
         
@@ -148,13 +204,13 @@ class PaperTrader:
         Returns:
             Dict with paper trade result information
         """
-        logger.info(f"PaperTrader.execute_paper_trade called for token: {token_address}")
-        logger.info(f"Trade params: {trade_params}")
-        logger.info(f"Bot state - paused: {self.paused}, auto_execution: {self.auto_execution}")
+        logger.info("PaperTrader.execute_paper_trade called for token: %s", token_address)
+        logger.info("Trade params: %s", trade_params)
+        logger.info("Bot state - paused: %s, auto_execution: %s", self.paused, self.auto_execution)
         
         # Check if bot is paused
         if self.paused:
-            logger.info(f"Signal for {token_address} ignored: bot is paused")
+            logger.info("Signal for %s ignored: bot is paused", token_address)
             return {
                 'success': False,
                 'error': 'Bot is paused. Enable auto-trading to execute this signal.'
@@ -162,20 +218,20 @@ class PaperTrader:
             
         # Check if auto-execution is enabled
         if not self.auto_execution:
-            logger.info(f"Signal for {token_address} ignored: auto-execution disabled")
+            logger.info("Signal for %s ignored: auto-execution disabled", token_address)
             return {
                 'success': False,
                 'error': 'Auto-execution is disabled. Enable it to automatically execute signals.'
             }
             
-        trade_id = str(uuid.uuid4())
+        trade_id = secrets.token_hex(16)
         
         try:
             # Extract trade parameters
             position_size = trade_params.get('position_size', self.trading_parameters['position_size'])
             stop_loss = trade_params.get('stop_loss', self.trading_parameters['initial_sl'])
             
-            logger.info(f"Using position size: {position_size}%, stop loss: {stop_loss}%")
+            logger.info("Using position size: %s%%, stop loss: %s%%", position_size, stop_loss)
             
             # Parse take profit levels
             take_profit_levels = [20, 40, 100]  # Default values
@@ -183,59 +239,52 @@ class PaperTrader:
             if take_profit_str:
                 try:
                     take_profit_levels = [float(level) for level in take_profit_str.split(',')]
-                    logger.info(f"Using take profit levels: {take_profit_levels}")
+                    logger.info("Using take profit levels: %s", take_profit_levels)
                 except Exception as e:
-                    logger.warning(f"Could not parse take profit levels: {take_profit_str}. Error: {str(e)}")
+                    logger.warning("Could not parse take profit levels: %s. Error: %s", take_profit_str, e)
                     
             # Calculate simulated price and transaction details
             current_price = self._get_current_price(token_address)
-            logger.info(f"Current simulated price: {current_price}")
+            logger.info("Current simulated price: %s", current_price)
             
             # Calculate position size based on account balance and parameter
             trade_amount_usd = self.virtual_balance * (position_size / 100)
             token_amount = trade_amount_usd / current_price
             
-            logger.info(f"Calculated trade amount: ${trade_amount_usd:.2f}, token amount: {token_amount}")
-            
-            # Simulate slippage
-            slippage = min(random.uniform(0.1, self.trading_parameters['max_slippage']), self.trading_parameters['max_slippage']) / 100
-            execution_price = current_price * (1 + slippage)
-            
-            # Simulate fees
-            fee_percentage = 0.25  # 0.25% fee
-            fee_amount = trade_amount_usd * (fee_percentage / 100)
+            logger.info("Calculated trade amount: $%.2f, token amount: %s", trade_amount_usd, token_amount)
             
-            # Adjust amounts for fees
-            actual_trade_amount = trade_amount_usd - fee_amount
+            # Simulate slippage and fees
+            execution_price, fee_amount, actual_trade_amount, slippage = self._apply_slippage_fees(
+                current_price, trade_amount_usd, 'buy')
             actual_token_amount = actual_trade_amount / execution_price
             
-            logger.info(f"After slippage ({slippage*100:.2f}%) and fees (${fee_amount:.2f}):")
-            logger.info(f"Execution price: {execution_price}, actual token amount: {actual_token_amount}")
+            logger.info("After slippage (%.2f%%) and fees ($%.2f):", slippage * 100, fee_amount)
+            logger.info("Execution price: %s, actual token amount: %s", execution_price, actual_token_amount)
             
             # Check if we have enough balance
             if trade_amount_usd > self.virtual_balance:
-                logger.warning(f"Insufficient balance: Required ${trade_amount_usd:.2f}, Available ${self.virtual_balance:.2f}")
+                logger.warning("Insufficient balance: Required $%.2f, Available $%.2f", trade_amount_usd, self.virtual_balance)
                 return {
                     'success': False,
                     'error': f"Insufficient virtual balance. Required: ${trade_amount_usd:.2f}, Available: ${self.virtual_balance:.2f}"
                 }
             
             # Create paper trade record
-            paper_trade = {
-                'trade_id': trade_id,
-                'token_address': token_address,
-                'token_name': self._get_token_name(token_address),
-                'entry_time': time.time(),
-                'entry_price': execution_price,
-                'amount': actual_token_amount,
-                'value_usd': actual_trade_amount,
-                'fee_usd': fee_amount,
-                'stop_loss_price': execution_price * (1 - (stop_loss / 100)),
-                'take_profit_levels': take_profit_levels,
-                'status': 'open',
-                'slippage': slippage * 100,  # Store as percentage
-                'type': 'buy'
-            }
+            paper_trade = PaperTradeRecord(
+                trade_id=trade_id,
+                token_address=token_address,
+                token_name=self._get_token_name(token_address),
+                entry_time=time.time(),
+                entry_price=execution_price,
+                amount=actual_token_amount,
+                value_usd=actual_trade_amount,
+                fee_usd=fee_amount,
+                stop_loss_price=execution_price * (1 - (stop_loss / 100)),
+                take_profit_levels=take_profit_levels,
+                status='open',
+                slippage=slippage * 100,  # Store as percentage
+                type='buy'
+            )
             
             # Update virtual balance
             self.virtual_balance -= trade_amount_usd
@@ -245,7 +294,7 @@ class PaperTrader:
             self.positions[symbol] = paper_trade
             
             # Add to history
-            self.trade_history.append(paper_trade.copy())
+            self.trade_history.append(replace(paper_trade))
             
             # Save data
             self._save_data()
@@ -255,12 +304,12 @@ class PaperTrader:
                 'success': True,
                 'trade_id': trade_id,
                 'token_address': token_address,
-                'token_name': paper_trade['token_name'],
+                'token_name': paper_trade.token_name,
                 'price': execution_price,
                 'amount': actual_token_amount,
                 'value_usd': actual_trade_amount,
                 'fee_usd': fee_amount,
-                'stop_loss_price': paper_trade['stop_loss_price'],
+                'stop_loss_price': paper_trade.stop_loss_price,
                 'take_profit_levels': take_profit_levels,
                 'slippage': slippage * 100
             }
@@ -268,12 +317,13 @@ class PaperTrader:
             # Start monitoring this position
             # In a real implementation, we would start a background task here
             
-            logger.info(f"Paper trade successfully executed: {symbol} for ${actual_trade_amount:.2f}")
+            logger.info("Paper trade successfully executed: %s for $%.2f", symbol, actual_trade_amount)
             return result
             
         except Exception as e:
-            logger.error(f"Error executing paper trade: {str(e)}")
-            logger.error(traceback.format_exc())  # Log full stack trace for debugging
+            logger.error("Error executing paper trade: %s", e)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Paper trade stack trace", exc_info=True)  # Full stack trace for debugging
             return {
                 'success': False,
                 'error': str(e)
@@ -290,13 +340,13 @@ class PaperTrader:
             else:
                 # Try to find by trade_id
                 for sym, pos in self.positions.items():
-                    if pos['trade_id'] == symbol_or_trade_id:
+                    if pos.trade_id == symbol_or_trade_id:
                         position = pos
                         symbol = sym
                         break
             
             if not position:
-                logger.warning(f"Position not found: {symbol_or_trade_id}")
+                logger.warning("Position not found: %s", symbol_or_trade_id)
                 return {
                     'success': False,
                     'error': f"Position not found: {symbol_or_trade_id}"
@@ -304,61 +354,51 @@ class PaperTrader:
             
             # Get current price if not provided
             if current_price is None:
-                current_price = self._get_current_price(position['token_address'])
-            
-            # Simulate slippage
-            slippage = min(random.uniform(0.1, self.trading_parameters['max_slippage']), self.trading_parameters['max_slippage']) / 100
-            execution_price = current_price * (1 - slippage)  # Negative slippage for selling
-            
-            # Calculate value
-            token_amount = position['amount']
-            position_value = token_amount * execution_price
+                current_price = self._get_current_price(position.token_address)
             
-            # Simulate fees
-            fee_percentage = 0.25  # 0.25% fee
-            fee_amount = position_value * (fee_percentage / 100)
-            
-            # Adjust for fees
-            actual_position_value = position_value - fee_amount
+            # Simulate slippage (negative for selling) and fees
+            token_amount = position.amount
+            execution_price, fee_amount, actual_position_value, slippage = self._apply_slippage_fees(
+                current_price, token_amount * current_price, 'sell')
             
             # Calculate profit/loss
-            entry_value = token_amount * position['entry_price']
+            entry_value = token_amount * position.entry_price
             realized_pnl = actual_position_value - entry_value
             pnl_percentage = (realized_pnl / entry_value) * 100 if entry_value > 0 else 0
             
             # Create closing trade record
-            closing_trade = {
-                'trade_id': str(uuid.uuid4()),
-                'related_trade_id': position['trade_id'],
-                'token_address': position['token_address'],
-                'token_name': position['token_name'],
-                'exit_time': time.time(),
-                'entry_price': position['entry_price'],
-                'exit_price': execution_price,
-                'amount': token_amount,
-                'value_usd': actual_position_value,
-                'fee_usd': fee_amount,
-                'realized_pnl': realized_pnl,
-                'pnl_percentage': pnl_percentage,
-                'holding_time': time.time() - position['entry_time'],
-                'close_reason': close_reason,
-                'status': 'closed',
-                'slippage': slippage * 100,  # Store as percentage
-                'type': 'sell'
-            }
+            closing_trade = PaperTradeRecord(
+                trade_id=secrets.token_hex(16),
+                related_trade_id=position.trade_id,
+                token_address=position.token_address,
+                token_name=position.token_name,
+                exit_time=time.time(),
+                entry_price=position.entry_price,
+                exit_price=execution_price,
+                amount=token_amount,
+                value_usd=actual_position_value,
+                fee_usd=fee_amount,
+                realized_pnl=realized_pnl,
+                pnl_percentage=pnl_percentage,
+                holding_time=time.time() - position.entry_time,
+                close_reason=close_reason,
+                status='closed',
+                slippage=slippage * 100,  # Store as percentage
+                type='sell'
+            )
             
             # Update virtual balance
             self.virtual_balance += actual_position_value
             
             # Update position's status in history
             for trade in self.trade_history:
-                if trade['trade_id'] == position['trade_id']:
-                    trade['status'] = 'closed'
-                    trade['exit_price'] = execution_price
-                    trade['exit_time'] = time.time()
-                    trade['realized_pnl'] = realized_pnl
-                    trade['pnl_percentage'] = pnl_percentage
-                    trade['close_reason'] = close_reason
+                if trade.trade_id == position.trade_id:
+                    trade.status = 'closed'
+                    trade.exit_price = execution_price
+                    trade.exit_time = time.time()
+                    trade.realized_pnl = realized_pnl
+                    trade.pnl_percentage = pnl_percentage
+                    trade.close_reason = close_reason
                     break
             
             # Add closing trade to history
@@ -373,10 +413,10 @@ class PaperTrader:
             # Return trade details
             result = {
                 'success': True,
-                'trade_id': closing_trade['trade_id'],
-                'token_address': position['token_address'],
-                'token_name': position['token_name'],
-                'entry_price': position['entry_price'],
+                'trade_id': closing_trade.trade_id,
+                'token_address': position.token_address,
+                'token_name': position.token_name,
+                'entry_price': position.entry_price,
                 'exit_price': execution_price,
                 'amount': token_amount,
                 'value_usd': actual_position_value,
@@ -386,11 +426,11 @@ class PaperTrader:
                 'close_reason': close_reason
             }
             
-            logger.info(f"Paper position closed: {symbol} for ${actual_position_value:.2f} ({pnl_percentage:.2f}% P/L)")
+            logger.info("Paper position closed: %s for $%.2f (%.2f%% P/L)", symbol, actual_position_value, pnl_percentage)
             return result
             
         except Exception as e:
-            logger.error(f"Error closing paper position: {str(e)}")
+            logger.error("Error closing paper position: %s", e)
             return {
                 'success': False,
                 'error': str(e)
@@ -400,27 +440,27 @@ class PaperTrader:
         """Get all open paper trading positions"""
         result = []
         for symbol, position in self.positions.items():
-            current_price = self._get_current_price(position['token_address'])
+            current_price = self._get_current_price(position.token_address)
             
             # Calculate unrealized P/L
-            position_value = position['amount'] * current_price
-            entry_value = position['amount'] * position['entry_price']
+            position_value = position.amount * current_price
+            entry_value = position.amount * position.entry_price
             unrealized_pnl = position_value - entry_value
             pnl_percentage = (unrealized_pnl / entry_value) * 100 if entry_value > 0 else 0
             
             position_info = {
                 'symbol': symbol,
-                'trade_id': position['trade_id'],
-                'token_address': position['token_address'],
-                'token_name': position['token_name'],
-                'entry_price': position['entry_price'],
+                'trade_id': position.trade_id,
+                'token_address': position.token_address,
+                'token_name': position.token_name,
+                'entry_price': position.entry_price,
                 'current_price': current_price,
-                'amount': position['amount'],
+                'amount': position.amount,
                 'value_usd': position_value,
                 'unrealized_pnl': unrealized_pnl,
                 'pnl_percentage': pnl_percentage,
-                'entry_time': position['entry_time'],
-                'holding_time': time.time() - position['entry_time']
+                'entry_time': position.entry_time,
+                'holding_time': time.time() - position.entry_time
             }
             result.append(position_info)
         
@@ -429,13 +469,13 @@ class PaperTrader:
     def get_trade_history(self, limit=50, offset=0):
         """Get paper trading history"""
         # Sort by time, newest first
-        sorted_trades = sorted(self.trade_history, key=lambda x: x.get('entry_time', 0), reverse=True)
+        sorted_trades = sorted(self.trade_history, key=lambda x: x.entry_time or 0, reverse=True)
         
         # Apply pagination
         paginated = sorted_trades[offset:offset+limit] if offset < len(sorted_trades) else []
         
         return {
-            'trades': paginated,
+            'trades': [trade.to_dict() for trade in paginated],
             'total': len(sorted_trades),
             'offset': offset,
             'limit': limit
@@ -471,17 +511,42 @@ class PaperTrader:
     
     def set_trading_mode(self, paused=None, auto_execution=None):
         """Update trading mode settings"""
-        if paused is not None:
+        changed = False
+        if paused is not None and paused != self.paused:
             self.paused = paused
-        if auto_execution is not None:
+            changed = True
+        if auto_execution is not None and auto_execution != self.auto_execution:
             self.auto_execution = auto_execution
+            changed = True
+            
+        # Nothing to persist if the mode is unchanged
+        if not changed:
+            logger.debug("Trading mode unchanged: paused=%s, auto_execution=%s", self.paused, self.auto_execution)
+            return True
             
         # Save data
         self._save_data()
         
-        logger.info(f"Trading mode updated: paused={self.paused}, auto_execution={self.auto_execution}")
+        logger.info("Trading mode updated: paused=%s, auto_execution=%s", self.paused, self.auto_execution)
         return True
     
+    def _apply_slippage_fees(self, price, notional, side):
+        """
+        Apply simulated slippage and fees to a trade
+        
+        For buys, notional is the USD amount spent; for sells, it is the position
+        value at the quoted price. Returns (execution_price, fee, net_value, slippage)
+        """
+        slippage = random.uniform(0.1, self.trading_parameters['max_slippage']) / 100
+        if side == 'buy':
+            execution_price = price * (1 + slippage)
+        else:
+            execution_price = price * (1 - slippage)
+            notional *= (1 - slippage)
+        
+        fee = notional * FEE_RATE
+        return execution_price, fee, notional - fee, slippage
+    
     def _get_current_price(self, token_address):
         """
         Get simulated current price for a token
@@ -494,8 +559,11 @@ class PaperTrader:
             # In a real implementation, this would call an API to get the current price
             
             # Seed based on token address to get a consistent base price
-            price_seed = int(token_address[-8:], 16) / 10**10 if token_address else 0.0001
-            base_price = max(0.000001, price_seed)  # Ensure price is positive
+            base_price = self._price_seed_cache.get(token_address)
+            if base_price is None:
+                price_seed = int(token_address[-8:], 16) / _SEED_DIV if token_address else 0.0001
+                base_price = max(0.000001, price_seed)  # Ensure price is positive
+                self._price_seed_cache[token_address] = base_price
             
             # Add some random fluctuation
             fluctuation = random.uniform(-0.05, 0.05)  # -5% to +5%
@@ -513,7 +581,7 @@ class PaperTrader:
             
             return current_price
         except Exception as e:
-            logger.error(f"Error generating price for {token_address}: {str(e)}")
+            logger.error("Error generating price for %s: %s", token_address, e)
             return 0.0001  # Return a default price on error
     
     def _get_token_name(self, token_address):
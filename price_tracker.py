@@ -10,12 +10,60 @@ import random  # For mock price data - remove in production
 
 logger = logging.getLogger(__name__)
 
+# Notification templates, filled in with str.format_map
+_TRACKING_STARTED_TEMPLATE = (
+    "🔍 TRACKING NEW TOKEN 🔍\n\n"
+    "Token: {token}\n"
+    "Entry Price: {price:.10f}\n"
+    "Initial Stop-Loss: {sl_level:.10f}\n"
+    "SL Distance: -{initial_sl_percent}%\n"
+    "Trailing Stop: {trail_percent}%"
+)
+_SL_UPDATE_HEADER = "🔄 TRAILING STOP-LOSS UPDATE 🔄\n\n"
+_SL_UPDATE_TEMPLATE = (
+    "Token: {token}\n"
+    "New Stop-Loss: {sl_level:.10f}\n"
+    "Current Price: {current_price:.10f}\n"
+    "Highest Price: {highest_price:.10f}\n"
+    "Price Change: {price_change:.2f}%"
+)
+_SL_TRIGGERED_TEMPLATE = (
+    "⚠️ STOP-LOSS TRIGGERED ⚠️\n\n"
+    "Token: {token}\n"
+    "Exit Price: {price:.10f}\n"
+    "Entry Price: {entry_price:.10f}\n"
+    "P/L: {profit_loss:.2f}%\n"
+    "Highest Price Reached: {highest_price:.10f}\n"
+    "Max P/L: {max_profit_loss:.2f}%\n"
+    "Time Held: {hours}h {minutes}m {seconds}s"
+)
+
 class PriceTracker:
     """Tracks token prices for trailing stop-loss functionality"""
     def __init__(self, telegram_client, config):
         self.telegram_client = telegram_client
         self.config = config
         self.tracking_signals = {}  # token_address -> tracking_info
+        self._session = None  # Shared HTTP session, created on first request
+        self._monitor_task = None  # Single background task monitoring all tracked tokens
+        self._price_cache = {}  # (token_address, time bucket) -> Future resolving to the price
+        self._notify_queue = None  # Outgoing notifications, drained by a single sender task
+        self._notifier_task = None
+        self._pending_sl_updates = []  # SL adjustments collected during the current monitor tick
+        
+        # Simulated prices are a testing fallback; they are disabled under python -O
+        # or by setting simulated_prices = False in the config
+        self._simulate_prices = __debug__ and getattr(config, 'simulated_prices', True)
+        self._rng = random.Random()  # Private RNG for simulated prices
+        
+        # Resolve optional settings once instead of probing the config on every fetch
+        self._price_api_type = getattr(config, 'price_api_type', None)
+        self._price_api_url = getattr(config, 'price_api_url', None)
+        self._price_api_key = getattr(config, 'price_api_key', None)
+        self._check_interval = getattr(config, 'price_check_interval', 15)
+        self._price_cache_ttl = getattr(config, 'price_cache_ttl', 10)
+        self._price_move_epsilon = getattr(config, 'price_move_epsilon', 1e-4)
+        self._fetch = self._select_price_source()
         
     async def start_tracking(self, token_address, initial_price=None):
         """Start tracking a token's price for trailing stop-loss"""
@@ -38,14 +86,16 @@ class PriceTracker:
             'entry_price': initial_price,
             'current_price': initial_price,
             'highest_price': initial_price,
+            'last_evaluated_price': initial_price,
             'initial_sl_level': initial_sl_level,
             'current_sl_level': initial_sl_level,
             'sl_triggered': False,
-            'start_time': time.time()
+            'start_time': time.monotonic()
         }
         
-        # Start background task to monitor price
-        asyncio.create_task(self.monitor_price(token_address))
+        # Make sure the shared monitor loop is running
+        if self._monitor_task is None or self._monitor_task.done():
+            self._monitor_task = asyncio.create_task(self._monitor_loop())
         
         logger.info(f"Started tracking {token_address} with initial price {initial_price}")
         
@@ -54,94 +104,205 @@ class PriceTracker:
         
         return True
         
-    async def monitor_price(self, token_address):
-        """Continuously monitor token price and adjust stop-loss"""
-        check_interval = self.config.price_check_interval if hasattr(self.config, 'price_check_interval') else 15
+    async def _monitor_loop(self):
+        """
+        Continuously monitor prices of all tracked tokens and adjust stop-losses
+        
+        Ticks run on a monotonic schedule every price_check_interval seconds
+        """
+        loop = asyncio.get_running_loop()
+        check_interval = self._check_interval
+        tracking_signals = self.tracking_signals
+        update_one = self._update_one
+        next_tick = loop.time()
         
-        while token_address in self.tracking_signals and not self.tracking_signals[token_address]['sl_triggered']:
+        while True:
+            active_tokens = [
+                token_address for token_address, tracking_info in tracking_signals.items()
+                if not tracking_info['sl_triggered']
+            ]
+            if not active_tokens:
+                break
+                
             try:
-                # Update current price
-                current_price = await self.get_current_price(token_address)
-                if not current_price:
-                    await asyncio.sleep(30)  # Wait before retrying
-                    continue
-                    
-                tracking_info = self.tracking_signals[token_address]
-                tracking_info['current_price'] = current_price
+                # Fetch all prices for this tick concurrently
+                prices = await self._fetch_prices_bulk(active_tokens)
                 
-                # Check if we have a new highest price
-                if current_price > tracking_info['highest_price']:
-                    tracking_info['highest_price'] = current_price
-                    
-                    # Adjust trailing stop-loss level
-                    new_sl_level = current_price * (1 - self.config.trail_percent / 100)
-                    
-                    # Only move stop-loss up, never down
-                    if new_sl_level > tracking_info['current_sl_level']:
-                        tracking_info['current_sl_level'] = new_sl_level
-                        logger.info(f"Adjusted trailing SL for {token_address}: {new_sl_level}")
+                for token_address, current_price in prices.items():
+                    # Tokens without a price are retried on the next tick
+                    if current_price:
+                        await update_one(token_address, current_price)
+                self._flush_sl_updates()
                         
-                        # Notify about the adjusted SL
-                        await self.notify_sl_adjustment(token_address, new_sl_level)
-                
-                # Check if stop-loss is triggered
-                if current_price <= tracking_info['current_sl_level']:
-                    tracking_info['sl_triggered'] = True
-                    logger.info(f"Stop-loss triggered for {token_address} at price {current_price}")
-                    
-                    # Notify about triggered SL
-                    await self.notify_sl_triggered(token_address, current_price)
-                    
-                # Sleep before next check
-                await asyncio.sleep(check_interval)
+                # Sleep until the next scheduled tick; ticks missed by a slow pass are skipped, not replayed
+                next_tick = max(next_tick + check_interval, loop.time())
+                await asyncio.sleep(max(0, next_tick - loop.time()))
                 
             except Exception as e:
-                logger.error(f"Error in price monitoring for {token_address}: {str(e)}")
+                logger.error(f"Error in price monitoring loop: {str(e)}")
                 await asyncio.sleep(60)  # Wait longer on error
+                next_tick = loop.time()
+    
+    async def _fetch_prices_bulk(self, token_addresses):
+        """Fetch current prices for several tokens at once"""
+        prices = await asyncio.gather(*(self.get_current_price(token_address) for token_address in token_addresses))
+        return dict(zip(token_addresses, prices))
+    
+    async def _update_one(self, token_address, current_price):
+        """Apply a new price to a tracked token, trailing its stop-loss and checking for a trigger"""
+        tracking_info = self.tracking_signals.get(token_address)
+        if not tracking_info or tracking_info['sl_triggered']:
+            return
+            
+        tracking_info['current_price'] = current_price
+        sl_level = tracking_info['current_sl_level']
+        
+        # Skip the trailing stop math unless the price moved beyond the dead-band
+        # since it was last evaluated; the trigger check below always runs
+        last_price = tracking_info['last_evaluated_price']
+        moved = abs(current_price - last_price) >= last_price * self._price_move_epsilon
+        if moved:
+            tracking_info['last_evaluated_price'] = current_price
+            
+        # Check if we have a new highest price
+        if moved and current_price > tracking_info['highest_price']:
+            tracking_info['highest_price'] = current_price
+            
+            # Adjust trailing stop-loss level; trail_percent is read live since
+            # paper trading can change it at runtime
+            new_sl_level = current_price * (1 - self.config.trail_percent / 100)
+            
+            # Only move stop-loss up, never down
+            if new_sl_level > sl_level:
+                tracking_info['current_sl_level'] = sl_level = new_sl_level
+                logger.info(f"Adjusted trailing SL for {token_address}: {new_sl_level}")
+                
+                # Notify about the adjusted SL
+                await self.notify_sl_adjustment(token_address, new_sl_level)
+        
+        # Check if stop-loss is triggered
+        if current_price <= sl_level:
+            tracking_info['sl_triggered'] = True
+            logger.info(f"Stop-loss triggered for {token_address} at price {current_price}")
+            
+            # Notify about triggered SL
+            await self.notify_sl_triggered(token_address, current_price)
+    
+    async def _get_session(self):
+        """Get the shared HTTP session, creating it if needed"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=10),
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300)
+            )
+        return self._session
+    
+    async def close(self):
+        """Stop the monitor loop and notifier, and close the shared HTTP session"""
+        if self._monitor_task is not None and not self._monitor_task.done():
+            self._monitor_task.cancel()
+        self._monitor_task = None
+        
+        # Send notifications still queued from the last tick before stopping the sender
+        if self._notifier_task is not None and not self._notifier_task.done():
+            self._flush_sl_updates()
+            try:
+                await asyncio.wait_for(self._notify_queue.join(), timeout=5)
+            except asyncio.TimeoutError:
+                logger.warning("Timed out sending queued price tracking notifications")
+            self._notifier_task.cancel()
+        self._notifier_task = None
+        
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
     
     async def get_current_price(self, token_address):
         """
-        Get current price of token from an API
+        Get current price of token, cached per price_cache_ttl interval
+        
+        Concurrent requests for the same token within an interval share a
+        single fetch. Failed or cancelled fetches are not cached.
+        """
+        bucket = int(time.time() // self._price_cache_ttl)
+        key = (token_address, bucket)
+        
+        cached = self._price_cache.get(key)
+        if cached is not None:
+            # Shield the shared fetch so a cancelled waiter doesn't cancel it for everyone
+            return await asyncio.shield(cached)
+            
+        # Drop entries from earlier intervals
+        for stale_key in [k for k in self._price_cache if k[1] < bucket]:
+            del self._price_cache[stale_key]
+            
+        future = asyncio.get_running_loop().create_future()
+        self._price_cache[key] = future
+        
+        price = None
+        try:
+            price = await self._fetch_price(token_address)
+            return price
+        finally:
+            if not price and self._price_cache.get(key) is future:
+                del self._price_cache[key]
+            if not future.done():
+                future.set_result(price)
+    
+    def _select_price_source(self):
+        """
+        Pick the price fetch method based on the configured price API
         
         IMPORTANT: This method should be customized to use your preferred price API.
         The example below uses a simulated price for testing purposes.
         Replace with your actual API integration code for production.
         """
-        try:
-            # OPTION 1: PancakeSwap API for BSC tokens
-            if hasattr(self.config, 'price_api_type') and self.config.price_api_type == 'pancakeswap':
-                return await self._get_pancakeswap_price(token_address)
-                
-            # OPTION 2: CoinGecko API
-            elif hasattr(self.config, 'price_api_type') and self.config.price_api_type == 'coingecko':
-                return await self._get_coingecko_price(token_address)
-                
-            # OPTION 3: Custom API endpoint
-            elif hasattr(self.config, 'price_api_url') and self.config.price_api_url:
-                return await self._get_custom_api_price(token_address)
-                
-            # Fallback: Simulated price (for testing only)
-            return await self._get_simulated_price(token_address)
+        # OPTION 1: PancakeSwap API for BSC tokens
+        if self._price_api_type == 'pancakeswap':
+            return self._get_pancakeswap_price
+            
+        # OPTION 2: CoinGecko API
+        elif self._price_api_type == 'coingecko':
+            return self._get_coingecko_price
             
+        # OPTION 3: Custom API endpoint
+        elif self._price_api_url:
+            return self._get_custom_api_price
+            
+        # Fallback: Simulated price (for testing only)
+        if not self._simulate_prices:
+            logger.warning("No price API configured and simulated prices are disabled; token prices will be unavailable")
+            return self._get_unavailable_price
+        return self._get_simulated_price
+    
+    async def _fetch_price(self, token_address):
+        """Get current price of token from the configured price source"""
+        try:
+            return await self._fetch(token_address)
         except Exception as e:
             logger.error(f"Error getting price for {token_address}: {str(e)}")
             return None
     
+    async def _get_unavailable_price(self, token_address):
+        """Used when no price API is configured and simulated prices are disabled"""
+        logger.debug("No price API configured for %s", token_address)
+        return None
+    
     async def _get_pancakeswap_price(self, token_address):
         """Get price from PancakeSwap API"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"https://api.pancakeswap.info/api/v2/tokens/{token_address}"
-                headers = {'accept': 'application/json'}
-                
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        price = float(data.get('data', {}).get('price', 0))
-                        return price
-                    else:
-                        logger.warning(f"PancakeSwap API returned status {response.status}")
-                        return None
+            session = await self._get_session()
+            url = f"https://api.pancakeswap.info/api/v2/tokens/{token_address}"
+            headers = {'accept': 'application/json'}
+            
+            async with session.get(url, headers=headers) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    price = float(data.get('data', {}).get('price', 0))
+                    return price
+                else:
+                    logger.warning(f"PancakeSwap API returned status {response.status}")
+                    return None
         except Exception as e:
             logger.error(f"PancakeSwap API error: {str(e)}")
             return None
@@ -151,20 +312,21 @@ class PriceTracker:
         try:
             # You'll need to map token addresses to CoinGecko IDs
             # This is a simplistic implementation
-            async with aiohttp.ClientSession() as session:
-                # First, try to get CoinGecko ID from contract address
-                platform = "ethereum"  # Change as needed (ethereum, binance-smart-chain, etc.)
-                url = f"https://api.coingecko.com/api/v3/coins/{platform}/contract/{token_address}"
-                
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        coin_id = data.get('id')
-                        price = data.get('market_data', {}).get('current_price', {}).get('usd', 0)
-                        return float(price)
-                    else:
-                        logger.warning(f"CoinGecko API returned status {response.status}")
-                        return None
+            session = await self._get_session()
+            
+            # First, try to get CoinGecko ID from contract address
+            platform = "ethereum"  # Change as needed (ethereum, binance-smart-chain, etc.)
+            url = f"https://api.coingecko.com/api/v3/coins/{platform}/contract/{token_address}"
+            
+            async with session.get(url) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    coin_id = data.get('id')
+                    price = data.get('market_data', {}).get('current_price', {}).get('usd', 0)
+                    return float(price)
+                else:
+                    logger.warning(f"CoinGecko API returned status {response.status}")
+                    return None
         except Exception as e:
             logger.error(f"CoinGecko API error: {str(e)}")
             return None
@@ -172,23 +334,23 @@ class PriceTracker:
     async def _get_custom_api_price(self, token_address):
         """Get price from custom API endpoint"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = self.config.price_api_url.replace("{token}", token_address)
-                headers = {}
-                
-                if hasattr(self.config, 'price_api_key') and self.config.price_api_key:
-                    headers['Authorization'] = f"Bearer {self.config.price_api_key}"
-                
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        # Extract price according to your API's response format
-                        # This is just an example - adjust according to your API
-                        price = float(data.get('price', 0))
-                        return price
-                    else:
-                        logger.warning(f"Custom API returned status {response.status}")
-                        return None
+            session = await self._get_session()
+            url = self._price_api_url.replace("{token}", token_address)
+            headers = {}
+            
+            if self._price_api_key:
+                headers['Authorization'] = f"Bearer {self._price_api_key}"
+            
+            async with session.get(url, headers=headers) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    # Extract price according to your API's response format
+                    # This is just an example - adjust according to your API
+                    price = float(data.get('price', 0))
+                    return price
+                else:
+                    logger.warning(f"Custom API returned status {response.status}")
+                    return None
         except Exception as e:
             logger.error(f"Custom API error: {str(e)}")
             return None
@@ -205,26 +367,44 @@ class PriceTracker:
             
         # Simulate price movement (up 70% of the time, down 30% of the time)
         # More realistic simulation with small movements
-        if random.random() < 0.7:  # 70% chance of price increase
-            change = random.uniform(0.001, 0.05)  # 0.1% to 5% increase
+        if self._rng.random() < 0.7:  # 70% chance of price increase
+            change = self._rng.uniform(0.001, 0.05)  # 0.1% to 5% increase
         else:
-            change = random.uniform(-0.03, -0.001)  # 0.1% to 3% decrease
+            change = self._rng.uniform(-0.03, -0.001)  # 0.1% to 3% decrease
             
         new_price = tracking_info['current_price'] * (1 + change)
         return new_price
     
+    def _queue_notification(self, message):
+        """Queue a notification for the sender task so monitoring never waits on Telegram"""
+        if self._notify_queue is None:
+            self._notify_queue = asyncio.Queue()
+        if self._notifier_task is None or self._notifier_task.done():
+            self._notifier_task = asyncio.create_task(self._notifier())
+        self._notify_queue.put_nowait(message)
+    
+    async def _notifier(self):
+        """Send queued notifications to the destination channel one at a time"""
+        while True:
+            message = await self._notify_queue.get()
+            try:
+                await self.telegram_client.send_message(self.config.destination_channel, message)
+            except Exception as e:
+                logger.error(f"Failed to send price tracking notification: {str(e)}")
+            finally:
+                self._notify_queue.task_done()
+    
     async def notify_tracking_started(self, token_address, price, sl_level):
         """Notify when price tracking starts"""
-        message = (
-            f"🔍 TRACKING NEW TOKEN 🔍\n\n"
-            f"Token: {token_address}\n"
-            f"Entry Price: {price:.10f}\n"
-            f"Initial Stop-Loss: {sl_level:.10f}\n"
-            f"SL Distance: -{self.config.initial_sl_percent}%\n"
-            f"Trailing Stop: {self.config.trail_percent}%"
-        )
+        message = _TRACKING_STARTED_TEMPLATE.format_map({
+            'token': token_address,
+            'price': price,
+            'sl_level': sl_level,
+            'initial_sl_percent': self.config.initial_sl_percent,
+            'trail_percent': self.config.trail_percent
+        })
         
-        await self.telegram_client.send_message(self.config.destination_channel, message)
+        self._queue_notification(message)
         
     async def notify_sl_adjustment(self, token_address, new_sl_level):
         """Notify about stop-loss adjustment"""
@@ -232,16 +412,23 @@ class PriceTracker:
         if not tracking_info:
             return
             
-        message = (
-            f"🔄 TRAILING STOP-LOSS UPDATE 🔄\n\n"
-            f"Token: {token_address}\n"
-            f"New Stop-Loss: {new_sl_level:.10f}\n"
-            f"Current Price: {tracking_info['current_price']:.10f}\n"
-            f"Highest Price: {tracking_info['highest_price']:.10f}\n"
-            f"Price Change: {((tracking_info['current_price'] / tracking_info['entry_price']) - 1) * 100:.2f}%"
-        )
+        # Collected and sent as one message at the end of the monitor tick
+        self._pending_sl_updates.append(_SL_UPDATE_TEMPLATE.format_map({
+            'token': token_address,
+            'sl_level': new_sl_level,
+            'current_price': tracking_info['current_price'],
+            'highest_price': tracking_info['highest_price'],
+            'price_change': ((tracking_info['current_price'] / tracking_info['entry_price']) - 1) * 100
+        }))
         
-        await self.telegram_client.send_message(self.config.destination_channel, message)
+    def _flush_sl_updates(self):
+        """Queue all stop-loss adjustments from this tick as a single notification"""
+        if not self._pending_sl_updates:
+            return
+            
+        message = _SL_UPDATE_HEADER + "\n\n".join(self._pending_sl_updates)
+        self._pending_sl_updates = []
+        self._queue_notification(message)
         
     async def notify_sl_triggered(self, token_address, price):
         """Notify when stop-loss is triggered"""
@@ -250,20 +437,20 @@ class PriceTracker:
             return
             
         profit_loss = ((price / tracking_info['entry_price']) - 1) * 100
-        time_held = time.time() - tracking_info['start_time']
-        hours = time_held // 3600
-        minutes = (time_held % 3600) // 60
-        seconds = time_held % 60
+        time_held = time.monotonic() - tracking_info['start_time']
+        hours, remainder = divmod(int(time_held), 3600)
+        minutes, seconds = divmod(remainder, 60)
         
-        message = (
-            f"⚠️ STOP-LOSS TRIGGERED ⚠️\n\n"
-            f"Token: {token_address}\n"
-            f"Exit Price: {price:.10f}\n"
-            f"Entry Price: {tracking_info['entry_price']:.10f}\n"
-            f"P/L: {profit_loss:.2f}%\n"
-            f"Highest Price Reached: {tracking_info['highest_price']:.10f}\n"
-            f"Max P/L: {((tracking_info['highest_price'] / tracking_info['entry_price']) - 1) * 100:.2f}%\n"
-            f"Time Held: {int(hours)}h {int(minutes)}m {int(seconds)}s"
-        )
+        message = _SL_TRIGGERED_TEMPLATE.format_map({
+            'token': token_address,
+            'price': price,
+            'entry_price': tracking_info['entry_price'],
+            'profit_loss': profit_loss,
+            'highest_price': tracking_info['highest_price'],
+            'max_profit_loss': ((tracking_info['highest_price'] / tracking_info['entry_price']) - 1) * 100,
+            'hours': hours,
+            'minutes': minutes,
+            'seconds': seconds
+        })
         
-        await self.telegram_client.send_message(self.config.destination_channel, message)
\ No newline at end of file
+        self._queue_notification(message)
\ No newline at end of file
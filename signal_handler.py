@@ -10,6 +10,42 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Patterns are compiled once at import time since they run on every message
+_EVM_ADDR_RE = re.compile(r'\b0x[a-fA-F0-9]{40}\b')
+_SOL_ADDR_RE = re.compile(r'\b[1-9A-HJ-NP-Za-km-z]{32,44}\b')
+_BASE58_DIGITS = '123456789'
+_MIN_ADDRESS_LENGTH = 32  # Shortest Solana address; EVM addresses are 42 characters
+_KEYWORDS_RE = re.compile(
+    r'\b(buy|sell|pump|ape|degen|hunt|sl|stop\s*loss|target|entry|exit|take\s*profit|tp|contract)\b',
+    re.IGNORECASE
+)
+# Cheap first-pass filter: a message can only match _KEYWORDS_RE if one of its words is in
+# this set ("stop loss" / "take profit" may be split, so their first words are included).
+# Words are split on _NON_WORD_RE so they break exactly where \b does, emoji included
+_KEYWORD_SET = frozenset({
+    'buy', 'sell', 'pump', 'ape', 'degen', 'hunt', 'sl', 'stop', 'stoploss', 'target',
+    'entry', 'exit', 'take', 'takeprofit', 'tp', 'contract'
+})
+_NON_WORD_RE = re.compile(r'\W+')
+_POSITION_RE = re.compile(r'(ape|position|allocate|buy)\s*(\d+(?:\.\d+)?)\s*%', re.IGNORECASE)
+_SL_RE = re.compile(r'(sl|stop\s*loss|stoploss)[:\s]*-?\s*(\d+(?:\.\d+)?)\s*%', re.IGNORECASE)
+_TP_RE = re.compile(r'(tp|take\s*profit)[:\s]*((?:\d+(?:\.\d+)?%[\s,]*)+)', re.IGNORECASE)
+_TP_VALUES_RE = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+
+def _find_token_address(message_text):
+    """Find the first EVM (0x-prefixed hex) or Solana (base58) address in the text"""
+    if '0x' in message_text:
+        match = _EVM_ADDR_RE.search(message_text)
+        if match:
+            return match.group(0)
+            
+    # Base58 addresses practically always contain a digit, so skip the regex otherwise
+    if not any(digit in message_text for digit in _BASE58_DIGITS):
+        return None
+        
+    match = _SOL_ADDR_RE.search(message_text)
+    return match.group(0) if match else None
+
 class Signal:
     """Represents a trading signal"""
     def __init__(self, token_address, message_text, source_channel):
@@ -31,12 +67,8 @@ class SignalParser:
         Extract token address from message text
         Returns None if no valid address is found
         """
-        # Look for wallet/contract address pattern (hex string of 40+ chars)
-        token_match = re.search(r'[a-zA-Z0-9]{40,}', message_text)
-        
-        if token_match:
-            return token_match.group(0)
-        return None
+        # Look for an EVM contract address or a Solana mint address
+        return _find_token_address(message_text)
     
     @staticmethod
     def is_signal_message(message_text):
@@ -44,20 +76,51 @@ class SignalParser:
         Determine if a message likely contains a trading signal
         Based on common patterns in trading signal messages
         """
-        # Check for common keywords
-        signal_keywords = [
-            'buy', 'sell', 'pump', 'ape', 'degen', 'hunt', 'sl', 'stop loss',
-            'target', 'entry', 'exit', 'take profit', 'tp', 'contract'
-        ]
-        
-        # Check if message has a token address
-        has_token = SignalParser.extract_token_address(message_text) is not None
-        
-        # Check if message has signal keywords
-        keyword_match = any(keyword.lower() in message_text.lower() for keyword in signal_keywords)
+        return SignalParser.signal_info(message_text)[1]
+    
+    @staticmethod
+    def may_be_signal(message_text):
+        """
+        Cheap check for whether a message could be a trading signal
+        False means it certainly isn't; True still needs signal_info
+        """
+        # A message shorter than any address cannot contain one
+        if not message_text or len(message_text) < _MIN_ADDRESS_LENGTH:
+            return False
+            
+        # casefold mirrors re.IGNORECASE, which also matches e.g. the long s as 's'
+        words = _NON_WORD_RE.split(message_text.casefold())
+        return not _KEYWORD_SET.isdisjoint(words)
+    
+    @staticmethod
+    def signal_info(message_text):
+        """
+        Extract the token address and signal check in a single pass
+        Returns a tuple of (token_address or None, is_signal)
         
+        Messages without any signal keyword are rejected before the address
+        search, in which case token_address is None.
+        """
+        if not SignalParser.may_be_signal(message_text):
+            return None, False
+            
+        token_address = _find_token_address(message_text)
+        if not token_address:
+            return None, False
+            
         # Signal messages typically have at least one keyword and a token address
-        return has_token and keyword_match
+        return token_address, _KEYWORDS_RE.search(message_text) is not None
+    
+    @staticmethod
+    def parse(message_text):
+        """
+        Parse a message into (token_address, trade_parameters) in one call
+        Returns None if the message is not a trading signal
+        """
+        token_address, is_signal = SignalParser.signal_info(message_text)
+        if not is_signal:
+            return None
+        return token_address, SignalParser.extract_trade_parameters(message_text)
     
     @staticmethod
     def extract_trade_parameters(message_text):
@@ -68,21 +131,21 @@ class SignalParser:
         params = {}
         
         # Extract position size (common formats: "Ape 5%" or "Position 2%" or "Allocate 10%")
-        position_match = re.search(r'(ape|position|allocate|buy)\s*(\d+(?:\.\d+)?)\s*%', message_text, re.IGNORECASE)
+        position_match = _POSITION_RE.search(message_text)
         if position_match:
             params['position_size'] = float(position_match.group(2))
         
         # Extract stop loss (common formats: "SL -30%" or "Stop Loss 25%" or "stoploss: 20%")
-        sl_match = re.search(r'(sl|stop\s*loss|stoploss)[:\s]*-?\s*(\d+(?:\.\d+)?)\s*%', message_text, re.IGNORECASE)
+        sl_match = _SL_RE.search(message_text)
         if sl_match:
             params['stop_loss'] = float(sl_match.group(2))
         
         # Extract take profit levels (common formats: "TP: 20%, 40%, 80%" or "Take Profit: 25% 50% 100%")
-        tp_match = re.search(r'(tp|take\s*profit)[:\s]*((?:\d+(?:\.\d+)?%[\s,]*)+)', message_text, re.IGNORECASE)
+        tp_match = _TP_RE.search(message_text)
         if tp_match:
             # Extract all percentages
             tp_str = tp_match.group(2)
-            tp_values = re.findall(r'(\d+(?:\.\d+)?)\s*%', tp_str)
+            tp_values = _TP_VALUES_RE.findall(tp_str)
             if tp_values:
                 params['take_profit'] = [float(val) for val in tp_values]
         
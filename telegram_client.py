@@ -6,9 +6,11 @@ This file handles Telegram client operations and trading signal detection.
 
 import asyncio
 import logging
+import os
 import re
+import struct
 import time
-import traceback
+from collections import OrderedDict
 from telethon import TelegramClient, events
 from signal_handler import Signal, SignalParser
 from trader import Trader
@@ -16,6 +18,40 @@ from paper_trader import PaperTrader  # Import PaperTrader
 
 logger = logging.getLogger(__name__)
 
+# Each processed signal is persisted as a fixed-size (chat_id, message_id) record
+_SIGNAL_RECORD = struct.Struct('<qq')
+
+# Queued admin messages are combined into one Telegram message up to this length
+_ADMIN_MESSAGE_LIMIT = 4096
+_ADMIN_MESSAGE_SEPARATOR = "\n\n---\n\n"
+
+# Admin notification templates, filled in with str.format_map
+_SIGNAL_DETECTED_TEMPLATE = (
+    "🔍 **SIGNAL DETECTED**\n\n"
+    "Token: `{token}`\n"
+    "Source: {source}\n"
+    "Position size: {position_size}%\n"
+    "Stop loss: {stop_loss}%\n\n"
+    "Executing trade in {mode} mode..."
+)
+_TRADE_EXECUTED_TEMPLATE = (
+    "✅ **TRADE EXECUTED {paper_tag}**\n\n"
+    "Token: `{token}`\n"
+    "Token Name: {token_name}\n"
+    "Amount: {amount}\n"
+    "Entry price: {price}\n"
+    "Value: ${value_usd:.2f}\n"
+    "Transaction ID: `{tx_id}...`\n\n"
+    "Stop loss set at: {stop_loss_price}\n"
+    "Take profit levels: {take_profit_levels}"
+)
+_TRADE_FAILED_TEMPLATE = (
+    "❌ **TRADE FAILED {paper_tag}**\n\n"
+    "Token: `{token}`\n"
+    "Error: {error}\n\n"
+    "Please check your {check_hint}."
+)
+
 class TelegramCopyTrader:
     """
     Signal detection and trading module
@@ -23,10 +59,25 @@ class TelegramCopyTrader:
     Instead of just copying messages, this class now detects signals
     and executes trades based on them.
     """
+    # Number of recent signal IDs kept for duplicate detection
+    MAX_PROCESSED_SIGNALS = 1000
+    
     def __init__(self, config):
         self.config = config
         self.session_name = config.session_name if hasattr(config, 'session_name') else 'stratos_session'
-        self.client = TelegramClient(self.session_name, config.api_id, config.api_hash)
+        self.client = TelegramClient(
+            self.session_name, config.api_id, config.api_hash,
+            # Reconnect quickly on flaky links so notifications and trades aren't stuck behind retries
+            connection_retries=5, retry_delay=1, timeout=10, request_retries=5,
+            flood_sleep_threshold=30, auto_reconnect=True
+        )
+        
+        # Register the message handler once so restarting the bot never adds duplicates.
+        # Messages that can't be signals are dropped by the filter before a handler task starts
+        self.client.add_event_handler(
+            self._handle_new_message,
+            events.NewMessage(chats=config.source_channels, func=self._may_be_signal_event)
+        )
         
         # Initialize appropriate trader based on mode
         self.is_paper_trading = getattr(config, 'paper_trading_mode', False)
@@ -48,18 +99,151 @@ class TelegramCopyTrader:
             self.paper_trader = None
             logger.info(f"Live trader initialized: {self.trader is not None}")
             
+        # Resolve the mode-specific trade executor and message parts once
+        if self.is_paper_trading:
+            self._execute_trade = self._execute_paper_trade
+            self._mode_name = 'PAPER'
+            self._paper_tag = '(PAPER)'
+            self._check_hint = 'paper trading settings'
+        else:
+            self._execute_trade = self._execute_live_trade
+            self._mode_name = 'LIVE'
+            self._paper_tag = ''
+            self._check_hint = 'exchange connection and wallet balance'
+            
         self.running = False
-        self.processed_signals = set()
+        self.processed_signals = OrderedDict()  # signal_id -> None, oldest first
+        self.processed_signals_file = 'processed_signals.bin'
+        self._processed_signals_fp = None
+        self._load_processed_signals()
+        self._last_trade_ts = OrderedDict()  # token_address -> monotonic time of the last accepted signal, oldest first
+        self.signal_cooldown = getattr(config, 'signal_cooldown_s', 300)
+        self._chat_titles = {}  # chat_id -> chat title
+        self.dex_name = getattr(config, 'dex_name', 'Unknown')
+        self._admin_queue = None  # Outgoing admin messages, drained by a single sender task
+        self._admin_sender_task = None
+        
+    def _load_processed_signals(self):
+        """Load recently processed signal IDs so a restart doesn't trade them again"""
+        if not os.path.exists(self.processed_signals_file):
+            return
+            
+        try:
+            with open(self.processed_signals_file, 'rb') as f:
+                data = f.read()
+            # Ignore a partial record left by an interrupted write
+            data = data[:len(data) - len(data) % _SIGNAL_RECORD.size]
+            for signal_id in _SIGNAL_RECORD.iter_unpack(data):
+                self.processed_signals[signal_id] = None
+                if len(self.processed_signals) > self.MAX_PROCESSED_SIGNALS:
+                    self.processed_signals.popitem(last=False)
+            logger.info(f"Loaded {len(self.processed_signals)} processed signal IDs")
+        except Exception as e:
+            logger.error(f"Error loading processed signals: {str(e)}")
+            
+    def _persist_signal_id(self, signal_id):
+        """Append a processed signal ID to disk, compacting the file when it grows too large"""
+        try:
+            if self._processed_signals_fp is None:
+                self._processed_signals_fp = open(self.processed_signals_file, 'ab', buffering=0)
+                
+            if self._processed_signals_fp.tell() >= 2 * self.MAX_PROCESSED_SIGNALS * _SIGNAL_RECORD.size:
+                # Rewrite the file with just the IDs still held in memory
+                self._processed_signals_fp.close()
+                tmp_file = f"{self.processed_signals_file}.tmp"
+                with open(tmp_file, 'wb') as f:
+                    f.write(b''.join(_SIGNAL_RECORD.pack(*sid) for sid in self.processed_signals))
+                os.replace(tmp_file, self.processed_signals_file)
+                self._processed_signals_fp = open(self.processed_signals_file, 'ab', buffering=0)
+            else:
+                self._processed_signals_fp.write(_SIGNAL_RECORD.pack(*signal_id))
+        except Exception as e:
+            logger.error(f"Error saving processed signal: {str(e)}")
+            
+    async def _get_chat_title(self, event):
+        """Get the title of the chat an event came from, cached per chat ID"""
+        title = self._chat_titles.get(event.chat_id)
+        if title is None:
+            # Only the first message from a chat may need to fetch its entity
+            chat = await event.get_chat()
+            if chat is None:
+                return 'Unknown'
+            title = getattr(chat, 'title', 'Unknown')
+            self._chat_titles[event.chat_id] = title
+        return title
+        
+    async def _execute_paper_trade(self, token_address, trade_params):
+        """Execute a trade with the paper trader, returns None if it isn't available"""
+        # Check if paper trader is properly initialized
+        if self.paper_trader is None:
+            logger.error("Paper trader is None - cannot execute trade!")
+            await self.send_admin_message("❌ **PAPER TRADING ERROR**: Trading module not initialized properly.")
+            return None
+            
+        logger.info("Executing paper trade for token: %s", token_address)
+        try:
+            trade_result = await self.paper_trader.execute_paper_trade(token_address, trade_params)
+            logger.info("Paper trade execution result: %s", trade_result)
+            return trade_result
+        except Exception as e:
+            logger.exception("Error executing paper trade: %s", e)  # Log full stack trace
+            return {'success': False, 'error': str(e)}
+            
+    async def _execute_live_trade(self, token_address, trade_params):
+        """Execute a trade with the live trader"""
+        logger.info("Executing live trade for token: %s", token_address)
+        return await self.trader.execute_trade(token_address, trade_params)
+        
+    def _may_be_signal_event(self, event):
+        """Event filter that passes only messages that could be signals"""
+        # Check the same markdown text process_message parses, which keeps link URLs
+        if SignalParser.may_be_signal(event.message.text):
+            return True
+        # Keep dropped messages visible when debugging missed signals
+        logger.debug("Ignoring message %s in chat %s: not a possible signal", event.id, event.chat_id)
+        return False
+        
+    async def _handle_new_message(self, event):
+        """Handle a new message from one of the source channels"""
+        await self.process_message(event)
         
     async def send_admin_message(self, message):
-        """Send a notification to the admin (user)"""
+        """Queue a notification to the admin (user) without waiting for Telegram"""
+        if self._admin_queue is None:
+            self._admin_queue = asyncio.Queue(maxsize=256)
+        if self._admin_sender_task is None or self._admin_sender_task.done():
+            self._admin_sender_task = asyncio.create_task(self._admin_sender())
         try:
-            # Send message to the user's "Saved Messages" chat
-            await self.client.send_message('me', message)
+            self._admin_queue.put_nowait(message)
             return True
-        except Exception as e:
-            logger.error(f"Failed to send admin message: {str(e)}")
+        except asyncio.QueueFull:
+            logger.warning("Admin message queue is full, dropping message")
             return False
+            
+    async def _admin_sender(self):
+        """Send queued admin messages, combining any backlog into a single message"""
+        carry_over = None  # Message that did not fit in the previous batch
+        while True:
+            message = carry_over if carry_over is not None else await self._admin_queue.get()
+            carry_over = None
+            messages = [message]
+            length = len(message)
+            while not self._admin_queue.empty():
+                message = self._admin_queue.get_nowait()
+                length += len(_ADMIN_MESSAGE_SEPARATOR) + len(message)
+                if length > _ADMIN_MESSAGE_LIMIT:
+                    carry_over = message
+                    break
+                messages.append(message)
+                
+            try:
+                # Send message to the user's "Saved Messages" chat
+                await self.client.send_message('me', _ADMIN_MESSAGE_SEPARATOR.join(messages))
+            except Exception as e:
+                logger.error(f"Failed to send admin message: {str(e)}")
+            finally:
+                for _ in messages:
+                    self._admin_queue.task_done()
         
     async def start(self):
         """Start the bot"""
@@ -105,17 +289,12 @@ class TelegramCopyTrader:
                 f"🚀 **STRATOS TRADING BOT ACTIVATED** 🚀\n\n"
                 f"System is now monitoring channels for trading signals.\n\n"
                 f"Mode: {trading_mode}\n"
-                f"Exchange: {self.config.dex_name if hasattr(self.config, 'dex_name') else 'Unknown'}\n"
+                f"Exchange: {self.dex_name}\n"
                 f"Position size: {self.config.position_size_percent}% of portfolio\n"
                 f"Initial SL: {self.config.initial_sl_percent}%\n"
                 f"Trailing stop: {self.config.trail_percent}%\n"
             )
             
-            # Register event handler for new messages
-            @self.client.on(events.NewMessage(chats=self.config.source_channels))
-            async def handle_new_message(event):
-                await self.process_message(event)
-                
             # Keep the bot running
             logger.info("Bot is now running and monitoring channels")
             logger.info(f"Monitoring channels: {self.config.source_channels}")
@@ -137,6 +316,19 @@ class TelegramCopyTrader:
             if not self.is_paper_trading and self.trader:
                 await self.trader.close()
             
+            if self._processed_signals_fp is not None:
+                self._processed_signals_fp.close()
+                self._processed_signals_fp = None
+                
+            # Give queued admin messages a chance to go out before disconnecting
+            if self._admin_sender_task is not None and not self._admin_sender_task.done():
+                try:
+                    await asyncio.wait_for(self._admin_queue.join(), timeout=5)
+                except asyncio.TimeoutError:
+                    logger.warning("Timed out sending queued admin messages")
+                self._admin_sender_task.cancel()
+            self._admin_sender_task = None
+                
             # Disconnect Telegram client
             await self.client.disconnect()
             self.running = False
@@ -155,98 +347,86 @@ class TelegramCopyTrader:
             if not message_text.strip():
                 return
                 
-            logger.info(f"Received message from {source_channel}: {message_text[:100]}...")
+            logger.info("Received message from %s: %.100s...", source_channel, message_text)
             
-            # Preliminary check if this is likely a signal message
-            if not SignalParser.is_signal_message(message_text):
-                logger.debug("Message doesn't appear to be a trading signal")
-                return
-                
-            # Try to extract token address
-            token_address = SignalParser.extract_token_address(message_text)
+            # Extract token address and trade parameters if this is likely a signal message
+            parsed = SignalParser.parse(message_text)
             
-            if not token_address:
-                logger.debug("No token address found in message")
+            if parsed is None:
+                logger.debug("Message doesn't appear to be a trading signal")
                 return
                 
-            logger.info(f"Detected potential trading signal for token: {token_address}")
+            token_address, trade_params = parsed
+            logger.info("Detected potential trading signal for token: %s", token_address)
             
-            # Generate signal ID to prevent duplicates
-            signal_id = f"{token_address}_{int(time.time())}"
+            # Use the Telegram message ID as the signal ID to prevent duplicates
+            signal_id = (source_channel, event.message.id)
             
             # Check if we've already processed this signal
             if signal_id in self.processed_signals:
-                logger.info(f"Skipping duplicate signal: {signal_id}")
+                logger.info("Skipping duplicate signal: %s", signal_id)
+                return
+                
+            # Skip the same token if it was signalled within the cooldown window
+            now = time.monotonic()
+            last_trade_ts = self._last_trade_ts.get(token_address)
+            if last_trade_ts is not None and now - last_trade_ts < self.signal_cooldown:
+                logger.info("Skipping signal for %s: still in %ss cooldown", token_address, self.signal_cooldown)
                 return
                 
             # Mark as processed to avoid duplicates
-            self.processed_signals.add(signal_id)
-            if len(self.processed_signals) > 1000:  # Limit the size
-                self.processed_signals = set(list(self.processed_signals)[-500:])
+            self.processed_signals[signal_id] = None
+            if len(self.processed_signals) > self.MAX_PROCESSED_SIGNALS:
+                self.processed_signals.popitem(last=False)
+            self._persist_signal_id(signal_id)
+            
+            # Forget tokens whose cooldown has expired, then start this token's cooldown
+            cooldowns = self._last_trade_ts
+            while cooldowns and now - next(iter(cooldowns.values())) >= self.signal_cooldown:
+                cooldowns.popitem(last=False)
+            cooldowns[token_address] = now
+            cooldowns.move_to_end(token_address)
                 
-            # Parse trade parameters from message
-            trade_params = SignalParser.extract_trade_parameters(message_text)
-            logger.info(f"Parsed trade parameters: {trade_params}")
+            logger.info("Parsed trade parameters: %s", trade_params)
             
             # Send notification about detected signal
-            chat_title = event.chat.title if hasattr(event.chat, 'title') else 'Unknown'
-            await self.send_admin_message(
-                f"🔍 **SIGNAL DETECTED**\n\n"
-                f"Token: `{token_address}`\n"
-                f"Source: {chat_title}\n"
-                f"Position size: {trade_params.get('position_size', self.config.position_size_percent)}%\n"
-                f"Stop loss: {trade_params.get('stop_loss', self.config.initial_sl_percent)}%\n\n"
-                f"Executing trade in {'PAPER mode' if self.is_paper_trading else 'LIVE mode'}..."
-            )
+            chat_title = await self._get_chat_title(event)
+            await self.send_admin_message(_SIGNAL_DETECTED_TEMPLATE.format_map({
+                'token': token_address,
+                'source': chat_title,
+                'position_size': trade_params.get('position_size', self.config.position_size_percent),
+                'stop_loss': trade_params.get('stop_loss', self.config.initial_sl_percent),
+                'mode': self._mode_name
+            }))
             
             # Execute the trade based on trading mode
-            if self.is_paper_trading:
-                # Check if paper trader is properly initialized
-                if self.paper_trader is None:
-                    logger.error("Paper trader is None - cannot execute trade!")
-                    await self.send_admin_message("❌ **PAPER TRADING ERROR**: Trading module not initialized properly.")
-                    return
-                
-                # Execute paper trade
-                logger.info(f"Executing paper trade for token: {token_address}")
-                try:
-                    trade_result = await self.paper_trader.execute_paper_trade(token_address, trade_params)
-                    logger.info(f"Paper trade execution result: {trade_result}")
-                except Exception as e:
-                    logger.error(f"Error executing paper trade: {str(e)}")
-                    logger.error(traceback.format_exc())  # Log full stack trace
-                    trade_result = {'success': False, 'error': str(e)}
-            else:
-                # Execute live trade
-                logger.info(f"Executing live trade for token: {token_address}")
-                trade_result = await self.trader.execute_trade(token_address, trade_params)
+            trade_result = await self._execute_trade(token_address, trade_params)
+            if trade_result is None:
+                return
             
             # Send trade result notification
             if trade_result['success']:
-                await self.send_admin_message(
-                    f"✅ **TRADE EXECUTED {'(PAPER)' if self.is_paper_trading else ''}**\n\n"
-                    f"Token: `{token_address}`\n"
-                    f"Token Name: {trade_result.get('token_name', 'Unknown')}\n"
-                    f"Amount: {trade_result.get('amount', 0)}\n"
-                    f"Entry price: {trade_result.get('price', 0)}\n"
-                    f"Value: ${trade_result.get('value_usd', 0):.2f}\n"
-                    f"Transaction ID: `{trade_result.get('tx_id', trade_result.get('trade_id', 'N/A'))[:10]}...`\n\n"
-                    f"Stop loss set at: {trade_result.get('stop_loss_price', 0)}\n"
-                    f"Take profit levels: {', '.join([f'{level}%' for level in trade_result.get('take_profit_levels', [])])}"
-                )
+                await self.send_admin_message(_TRADE_EXECUTED_TEMPLATE.format_map({
+                    'paper_tag': self._paper_tag,
+                    'token': token_address,
+                    'token_name': trade_result.get('token_name', 'Unknown'),
+                    'amount': trade_result.get('amount', 0),
+                    'price': trade_result.get('price', 0),
+                    'value_usd': trade_result.get('value_usd', 0),
+                    'tx_id': trade_result.get('tx_id', trade_result.get('trade_id', 'N/A'))[:10],
+                    'stop_loss_price': trade_result.get('stop_loss_price', 0),
+                    'take_profit_levels': ', '.join([f'{level}%' for level in trade_result.get('take_profit_levels', [])])
+                }))
                 
-                # Start monitoring trade for stop loss and take profit (for live trading)
-                if not self.is_paper_trading and self.trader:
-                    asyncio.create_task(self.trader.monitor_trade(trade_result['trade_id']))
+                # Trader.execute_trade schedules live trades on its shared monitor loop
             else:
-                await self.send_admin_message(
-                    f"❌ **TRADE FAILED {'(PAPER)' if self.is_paper_trading else ''}**\n\n"
-                    f"Token: `{token_address}`\n"
-                    f"Error: {trade_result['error']}\n\n"
-                    f"Please check your {'paper trading settings' if self.is_paper_trading else 'exchange connection and wallet balance'}."
-                )
+                await self.send_admin_message(_TRADE_FAILED_TEMPLATE.format_map({
+                    'paper_tag': self._paper_tag,
+                    'token': token_address,
+                    'error': trade_result['error'],
+                    'check_hint': self._check_hint
+                }))
                 
         except Exception as e:
-            logger.error(f"Error processing message: {str(e)}")
-            logger.error(traceback.format_exc())  # Log full stack trace
+            logger.exception("Error processing message: %s", e)  # Log full stack trace
             await self.send_admin_message(f"⚠️ Error processing signal: {str(e)}")
\ No newline at end of file
@@ -8,9 +8,13 @@ import logging
 import json
 import time
 import asyncio
-import uuid
 import hmac
 import hashlib
+import heapq
+import os
+import random
+import secrets
+from collections import OrderedDict
 from decimal import Decimal
 
 logger = logging.getLogger(__name__)
@@ -25,7 +29,53 @@ class Trader:
         self.wallet = None
         self.router = None
         self.active_trades = {}
-        self.token_cache = {}  # Cache for token data (liquidity, taxes, etc.)
+        
+        self._rng = random.Random()  # Private RNG for simulated token data and prices
+        
+        # Token safety results (liquidity, taxes, etc.), persisted so restarts don't re-check tokens
+        self.token_cache = OrderedDict()  # token_address -> (checked_at, (is_safe, details)), oldest first
+        self.token_cache_file = 'token_cache.json'
+        self.token_cache_ttl = getattr(config, 'token_cache_ttl', 3600)
+        self.token_cache_size = getattr(config, 'token_cache_size', 1024)
+        self._load_token_cache()
+        self._pending_safety_checks = {}  # token_address -> future for a check in progress
+        
+        # All active trades are monitored by one task working through a schedule
+        self._monitor_schedule = []  # heap of (next check time, trade_id)
+        self._monitor_wakeup = asyncio.Event()
+        self._monitor_task = None
+        self._monitor_checks = set()  # In-flight per-trade check tasks
+    
+    def _load_token_cache(self):
+        """Load unexpired token safety results from file"""
+        if not os.path.exists(self.token_cache_file):
+            return
+            
+        try:
+            with open(self.token_cache_file, 'r') as f:
+                entries = json.load(f)
+                
+            cutoff = time.time() - self.token_cache_ttl
+            for token_address, (checked_at, is_safe, details) in entries.items():
+                if checked_at > cutoff:
+                    self.token_cache[token_address] = (checked_at, (is_safe, details))
+            while len(self.token_cache) > self.token_cache_size:
+                self.token_cache.popitem(last=False)
+            logger.info(f"Loaded {len(self.token_cache)} cached token safety results")
+        except Exception as e:
+            logger.error(f"Error loading token cache: {str(e)}")
+            
+    def _save_token_cache(self):
+        """Save token safety results to file"""
+        try:
+            entries = {
+                token_address: [checked_at, is_safe, details]
+                for token_address, (checked_at, (is_safe, details)) in self.token_cache.items()
+            }
+            with open(self.token_cache_file, 'w') as f:
+                json.dump(entries, f)
+        except Exception as e:
+            logger.error(f"Error saving token cache: {str(e)}")
     
     async def initialize(self):
         """Initialize DEX connections based on configured chain"""
@@ -97,10 +147,15 @@ class Trader:
         """Close DEX connections"""
         logger.info(f"Closing exchange connection")
         
-        # Cancel any ongoing monitoring tasks
-        for trade_id in list(self.active_trades.keys()):
-            if 'task' in self.active_trades[trade_id]:
-                self.active_trades[trade_id]['task'].cancel()
+        # Stop monitoring active trades
+        monitor_task, self._monitor_task = self._monitor_task, None
+        tasks = [task for task in (monitor_task, *self._monitor_checks) if task is not None and not task.done()]
+        for task in tasks:
+            task.cancel()
+        # Let in-progress exits finish unwinding before the connection goes away
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._monitor_checks.clear()
+        self._monitor_schedule.clear()
                 
         # Clear any cached data
         self.token_cache.clear()
@@ -109,29 +164,53 @@ class Trader:
         """
         Check if a memecoin is safe to trade
         Returns a tuple of (is_safe, details)
+        
+        Concurrent checks for the same token share a single analysis.
         """
+        # Check if we have fresh cached data for this token
+        cached = self.token_cache.get(token_address)
+        if cached is not None:
+            checked_at, result = cached
+            if time.time() - checked_at < self.token_cache_ttl:
+                self.token_cache.move_to_end(token_address)
+                return result
+            del self.token_cache[token_address]
+            
+        pending = self._pending_safety_checks.get(token_address)
+        if pending is not None:
+            # Shield the shared future so a cancelled waiter doesn't cancel it for everyone
+            return await asyncio.shield(pending)
+            
+        future = asyncio.get_running_loop().create_future()
+        self._pending_safety_checks[token_address] = future
+        
+        result = (False, {'error': 'Token safety check was cancelled'})
+        try:
+            result = await self._analyze_token_safety(token_address)
+            return result
+        finally:
+            del self._pending_safety_checks[token_address]
+            future.set_result(result)
+    
+    async def _analyze_token_safety(self, token_address):
+        """Analyze a token's liquidity, taxes and holders, caching the result"""
         try:
-            # Check if we have cached data for this token
-            if token_address in self.token_cache:
-                return self.token_cache[token_address]
-            
             logger.info(f"Checking token safety for {token_address}")
             
             # Simulate token analysis
             await asyncio.sleep(2)
             
             # For simulation, generate random-ish but realistic results
-            import random
-            
             # Generate "realistic" memecoin data
-            liquidity = round(random.uniform(10000, 2000000), 2)
-            buy_tax = round(random.uniform(0, 20), 1)
-            sell_tax = round(random.uniform(buy_tax, buy_tax + 10), 1)
-            holder_count = random.randint(10, 5000)
-            top_holder_percent = round(random.uniform(10, 80), 1)
-            is_honeypot = random.random() < 0.15  # 15% chance of being a honeypot
+            liquidity = round(self._rng.uniform(10000, 2000000), 2)
+            buy_tax = round(self._rng.uniform(0, 20), 1)
+            sell_tax = round(self._rng.uniform(buy_tax, buy_tax + 10), 1)
+            holder_count = self._rng.randint(10, 5000)
+            top_holder_percent = round(self._rng.uniform(10, 80), 1)
+            is_honeypot = self._rng.random() < 0.15  # 15% chance of being a honeypot
             
             # Determine if the token is "safe" based on our criteria
+            # Trading parameters are read from the config on use since they can change at runtime
             min_liquidity = getattr(self.config, 'min_liquidity_usd', 50000)
             max_buy_tax = getattr(self.config, 'max_buy_tax', 10)
             max_sell_tax = getattr(self.config, 'max_sell_tax', 15)
@@ -163,8 +242,11 @@ class Trader:
                 'is_holder_dist_ok': is_holder_dist_ok
             }
             
-            # Cache the results
-            self.token_cache[token_address] = (is_safe, details)
+            # Cache the results, evicting the least recently used token if full
+            self.token_cache[token_address] = (time.time(), (is_safe, details))
+            if len(self.token_cache) > self.token_cache_size:
+                self.token_cache.popitem(last=False)
+            self._save_token_cache()
             
             return (is_safe, details)
             
@@ -183,7 +265,9 @@ class Trader:
         Returns:
             Dict with trade result information
         """
-        trade_id = str(uuid.uuid4())
+        # Draw the random bytes for both the trade ID and the simulated transaction ID at once
+        id_bytes = secrets.token_bytes(32)
+        trade_id = id_bytes[:16].hex()
         
         try:
             # First, check if the token is safe to trade
@@ -202,8 +286,9 @@ class Trader:
             stop_loss = trade_params.get('stop_loss', getattr(self.config, 'initial_sl_percent', 30))
             
             # Parse take profit levels
-            if hasattr(self.config, 'take_profit_levels') and self.config.take_profit_levels:
-                take_profit_levels = [float(level) for level in self.config.take_profit_levels.split(',')]
+            configured_levels = getattr(self.config, 'take_profit_levels', None)
+            if configured_levels:
+                take_profit_levels = [float(level) for level in configured_levels.split(',')]
             else:
                 take_profit_levels = [20, 40, 100]  # Default values
                 
@@ -223,7 +308,7 @@ class Trader:
             
             # Simulate the actual buy transaction
             await asyncio.sleep(2)  # Simulate blockchain transaction time
-            tx_id = f"0x{uuid.uuid4().hex}"
+            tx_id = f"0x{id_bytes[16:].hex()}"
             
             # Prepare successful trade result
             result = {
@@ -255,9 +340,8 @@ class Trader:
             
             logger.info(f"Successfully bought memecoin {token_address}, trade ID: {trade_id}")
             
-            # Start monitoring task
-            monitoring_task = asyncio.create_task(self.monitor_trade(trade_id))
-            self.active_trades[trade_id]['task'] = monitoring_task
+            # Start monitoring the trade
+            await self.monitor_trade(trade_id)
             
             return result
                 
@@ -267,149 +351,195 @@ class Trader:
     
     async def monitor_trade(self, trade_id):
         """
-        Monitor an active trade for stop loss and take profit conditions
-        This function runs as a separate task for each active trade
+        Start monitoring an active trade for stop loss and take profit conditions
+        All trades are checked by a single scheduler task
         """
         if trade_id not in self.active_trades:
             logger.error(f"Cannot monitor unknown trade ID: {trade_id}")
             return
             
         trade = self.active_trades[trade_id]
-        token_address = trade['token_address']
-        entry_price = trade['entry_price']
-        stop_loss_price = trade['stop_loss_price']
-        take_profit_levels = trade['take_profit_levels']
-        amount = trade['amount']
-        sell_tax = trade['safety_details']['sell_tax_percent']
-        
-        logger.info(f"Starting price monitoring for {token_address}")
+        logger.info(f"Starting price monitoring for {trade['token_address']}")
         
-        try:
-            # Import random for simulation
-            import random
-            
-            # Track the highest price seen for trailing stop loss
-            highest_price = entry_price
-            take_profit_triggered = [False] * len(take_profit_levels)
-            remaining_amount = amount
-            
+        # Per-trade monitoring state
+        trade.update({
+            'initial_amount': trade['amount'],
+            'highest_price': trade['entry_price'],  # Highest price seen for trailing stop loss
+            # Take profit (price, level) thresholds in ascending price order, and the next one to hit
+            'take_profit_targets': sorted(
+                (trade['entry_price'] * (1 + (tp_level / 100)), tp_level)
+                for tp_level in trade['take_profit_levels']
+            ),
+            'next_take_profit': 0,
             # For memecoin simulation, create a more volatile price pattern
             # Memecoins often have big pumps followed by dumps
-            price_multiplier = 1.0
-            counter = 0
-            phase = 'pump'  # Start with pump phase
-            
+            'price_multiplier': 1.0,
+            'counter': 0,
+            'phase': 'pump'  # Start with pump phase
+        })
+        
+        # First check runs right away
+        heapq.heappush(self._monitor_schedule, (time.monotonic(), trade_id))
+        self._monitor_wakeup.set()
+        if self._monitor_task is None or self._monitor_task.done():
+            self._monitor_task = asyncio.create_task(self._monitor_loop())
+    
+    async def _monitor_loop(self):
+        """Start a check for every trade that is due, then sleep until the next one is"""
+        try:
             while True:
-                counter += 1
-                
-                # Simulate price movement with high volatility typical for memecoins
-                if phase == 'pump':
-                    # Pumps can be dramatic, up to 500%
-                    change = 0.05 * (0.5 + (counter % 10) / 10)
-                    price_multiplier *= (1 + change)
+                self._monitor_wakeup.clear()
+                if not self._monitor_schedule:
+                    await self._monitor_wakeup.wait()
+                    continue
                     
-                    # Eventually transition to dump phase
-                    if counter % 15 == 0 and counter > 30:
-                        phase = 'dump'
-                        logger.info(f"Price trend changing to dump phase for {token_address}")
-                
-                elif phase == 'dump':
-                    # Dumps can be steep
-                    change = 0.04 * (0.5 + (counter % 8) / 8)
-                    price_multiplier *= (1 - change)
+                delay = self._monitor_schedule[0][0] - time.monotonic()
+                if delay > 0:
+                    # Wake early if a new trade is scheduled in the meantime
+                    try:
+                        await asyncio.wait_for(self._monitor_wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
                     
-                    # Sometimes recover to pump again
-                    if counter % 25 == 0:
-                        phase = 'pump'
-                        logger.info(f"Price trend changing to pump phase for {token_address}")
-                
-                elif phase == 'moon':
-                    # Occasionally, dramatic price explosion
-                    change = 0.2 * (0.5 + (counter % 5) / 5)
-                    price_multiplier *= (1 + change)
+                now = time.monotonic()
+                due = []
+                while self._monitor_schedule and self._monitor_schedule[0][0] <= now:
+                    due.append(heapq.heappop(self._monitor_schedule)[1])
+                    
+                # Each check runs as its own task and reschedules its trade when it
+                # completes, so a slow exit never delays any other trade's checks
+                for trade_id in due:
+                    if trade_id in self.active_trades:
+                        task = asyncio.create_task(self._run_check(trade_id))
+                        self._monitor_checks.add(task)
+                        task.add_done_callback(self._monitor_checks.discard)
+                        
+        except asyncio.CancelledError:
+            logger.info("Trade monitoring cancelled")
+            raise
+    
+    async def _run_check(self, trade_id):
+        """Check a due trade and schedule its next check unless it is finished"""
+        done = await self._check_trade(trade_id)
+        if not done and trade_id in self.active_trades:
+            next_check = time.monotonic() + 3  # Check more frequently for demo purposes
+            heapq.heappush(self._monitor_schedule, (next_check, trade_id))
+            self._monitor_wakeup.set()
+    
+    async def _check_trade(self, trade_id):
+        """
+        Run one monitoring step for an active trade
+        Returns True when the trade no longer needs monitoring
+        """
+        trade = self.active_trades[trade_id]
+        token_address = trade['token_address']
+        
+        try:
+            entry_price = trade['entry_price']
+            take_profit_targets = trade['take_profit_targets']
+            sell_tax = trade['safety_details']['sell_tax_percent']
+            
+            trade['counter'] += 1
+            counter = trade['counter']
+            phase = trade['phase']
+            
+            # Simulate price movement with high volatility typical for memecoins
+            if phase == 'pump':
+                # Pumps can be dramatic, up to 500%
+                change = 0.05 * (0.5 + (counter % 10) / 10)
+                trade['price_multiplier'] *= (1 + change)
                 
-                # Randomly enter "moon" phase with low probability
-                if phase == 'pump' and counter % 50 == 0 and random.random() < 0.1:
-                    phase = 'moon'
-                    logger.info(f"🚀 Price MOONING for {token_address}")
+                # Eventually transition to dump phase
+                if counter % 15 == 0 and counter > 30:
+                    phase = 'dump'
+                    logger.info("Price trend changing to dump phase for %s", token_address)
+            
+            elif phase == 'dump':
+                # Dumps can be steep
+                change = 0.04 * (0.5 + (counter % 8) / 8)
+                trade['price_multiplier'] *= (1 - change)
                 
-                # Calculate current price
-                current_price = entry_price * price_multiplier
+                # Sometimes recover to pump again
+                if counter % 25 == 0:
+                    phase = 'pump'
+                    logger.info("Price trend changing to pump phase for %s", token_address)
+            
+            elif phase == 'moon':
+                # Occasionally, dramatic price explosion
+                change = 0.2 * (0.5 + (counter % 5) / 5)
+                trade['price_multiplier'] *= (1 + change)
+            
+            # Randomly enter "moon" phase with low probability
+            if phase == 'pump' and counter % 50 == 0 and self._rng.random() < 0.1:
+                phase = 'moon'
+                logger.info("🚀 Price MOONING for %s", token_address)
+            trade['phase'] = phase
+            
+            # Calculate current price
+            current_price = entry_price * trade['price_multiplier']
+            
+            # Update highest price for trailing stop
+            if current_price > trade['highest_price']:
+                trade['highest_price'] = current_price
                 
-                # Update highest price for trailing stop
-                if current_price > highest_price:
-                    highest_price = current_price
+                # Update trailing stop loss if enabled
+                trail_percent = getattr(self.config, 'trail_percent', 0)
+                if trail_percent > 0:
+                    # Account for sell tax in trailing stop
+                    adjusted_trail = trail_percent + (sell_tax / 2)
+                    new_stop_loss = current_price * (1 - (adjusted_trail / 100))
                     
-                    # Update trailing stop loss if enabled
-                    if hasattr(self.config, 'trail_percent') and self.config.trail_percent > 0:
-                        # Account for sell tax in trailing stop
-                        adjusted_trail = self.config.trail_percent + (sell_tax / 2)
-                        new_stop_loss = highest_price * (1 - (adjusted_trail / 100))
+                    # Only move stop loss up, never down
+                    if new_stop_loss > trade['stop_loss_price']:
+                        trade['stop_loss_price'] = new_stop_loss
                         
-                        # Only move stop loss up, never down
-                        if new_stop_loss > stop_loss_price:
-                            stop_loss_price = new_stop_loss
-                            self.active_trades[trade_id]['stop_loss_price'] = stop_loss_price
-                            
-                            logger.info(f"Adjusted trailing stop loss for {token_address}: {stop_loss_price}")
+                        logger.info("Adjusted trailing stop loss for %s: %s", token_address, new_stop_loss)
+            
+            # Check for stop loss
+            if current_price <= trade['stop_loss_price']:
+                logger.info("Stop loss triggered for %s at %s", token_address, current_price)
                 
-                # Check for stop loss
-                if current_price <= stop_loss_price:
-                    logger.info(f"Stop loss triggered for {token_address} at {current_price}")
-                    
-                    # Execute stop loss (sell remaining tokens)
-                    await self._execute_exit(trade_id, 'stop_loss', current_price, remaining_amount)
-                    
-                    # Remove from active trades
-                    if trade_id in self.active_trades:
-                        del self.active_trades[trade_id]
-                        
-                    # End monitoring
-                    return
+                # Execute stop loss (sell remaining tokens)
+                await self._execute_exit(trade_id, 'stop_loss', current_price, trade['amount'])
                 
-                # Check take profit levels
-                for i, tp_level in enumerate(take_profit_levels):
-                    if not take_profit_triggered[i]:
-                        # Calculate take profit price
-                        tp_price = entry_price * (1 + (tp_level / 100))
-                        
-                        if current_price >= tp_price:
-                            # Mark this level as triggered
-                            take_profit_triggered[i] = True
-                            
-                            # Calculate amount to sell at this level
-                            sell_portion = amount / len(take_profit_levels)
-                            
-                            # Keep track of remaining amount
-                            remaining_amount -= sell_portion
-                            
-                            # Execute partial take profit
-                            await self._execute_exit(
-                                trade_id, 
-                                f'take_profit_{tp_level}', 
-                                current_price, 
-                                sell_portion
-                            )
-                            
-                            # Update remaining amount in stored trade info
-                            self.active_trades[trade_id]['amount'] = remaining_amount
-                            
-                            logger.info(f"Take profit {tp_level}% triggered for {token_address}")
+                # Remove from active trades
+                self.active_trades.pop(trade_id, None)
+                return True
+            
+            # Check take profit levels, walking up the sorted thresholds the price has reached
+            while (trade['next_take_profit'] < len(take_profit_targets)
+                   and current_price >= take_profit_targets[trade['next_take_profit']][0]):
+                tp_level = take_profit_targets[trade['next_take_profit']][1]
+                trade['next_take_profit'] += 1
                 
-                # If all take profit levels triggered, end monitoring
-                if all(take_profit_triggered):
-                    logger.info(f"All take profit levels triggered for {token_address}")
-                    if trade_id in self.active_trades:
-                        del self.active_trades[trade_id]
-                    return
-                    
-                # Wait before next check
-                await asyncio.sleep(3)  # Check more frequently for demo purposes
+                # Calculate amount to sell at this level
+                sell_portion = trade['initial_amount'] / len(take_profit_targets)
                 
-        except asyncio.CancelledError:
-            logger.info(f"Monitoring for {token_address} cancelled")
+                # Keep track of remaining amount
+                trade['amount'] -= sell_portion
+                
+                # Execute partial take profit
+                await self._execute_exit(
+                    trade_id, 
+                    f'take_profit_{tp_level}', 
+                    current_price, 
+                    sell_portion
+                )
+                
+                logger.info("Take profit %s%% triggered for %s", tp_level, token_address)
+            
+            # If all take profit levels triggered, end monitoring
+            if trade['next_take_profit'] == len(take_profit_targets):
+                logger.info("All take profit levels triggered for %s", token_address)
+                self.active_trades.pop(trade_id, None)
+                return True
+                
+            return False
+            
         except Exception as e:
             logger.error(f"Error monitoring trade for {token_address}: {str(e)}")
+            return True
     
     async def _execute_exit(self, trade_id, exit_type, current_price, amount):
         """Execute an exit trade (stop loss or take profit)"""
@@ -425,8 +555,8 @@ class Trader:
             price_change = ((current_price / trade['entry_price']) - 1) * 100
             sell_tax = trade['safety_details']['sell_tax_percent']
             
-            logger.info(f"Executing {exit_type} for {token_address}")
-            logger.info(f"Price: {current_price}, Change: {price_change:.2f}%, Amount: {amount}")
+            logger.info("Executing %s for %s", exit_type, token_address)
+            logger.info("Price: %s, Change: %.2f%%, Amount: %s", current_price, price_change, amount)
             
             # Simulate blockchain transaction
             await asyncio.sleep(1.5)
@@ -435,8 +565,8 @@ class Trader:
             net_price = current_price * (1 - (sell_tax / 100))
             proceeds = amount * net_price
             
-            logger.info(f"Exit successful: sold {amount} tokens at {current_price} (net {net_price} after {sell_tax}% tax)")
-            logger.info(f"Proceeds: ${proceeds:.2f}, P/L: {price_change:.2f}%")
+            logger.info("Exit successful: sold %s tokens at %s (net %s after %s%% tax)", amount, current_price, net_price, sell_tax)
+            logger.info("Proceeds: $%.2f, P/L: %.2f%%", proceeds, price_change)
             
             return True
                 
@@ -2,10 +2,15 @@
 Utility functions for the Stratos Trading Bot
 """
 
+import atexit
+import functools
 import logging
+import logging.handlers
 import os
 import json
+import queue
 import re
+import string
 import subprocess
 import platform
 import sys
@@ -13,21 +18,129 @@ from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Patterns are compiled once at import time instead of on every call
+_CHANNEL_ID_STRIP_RE = re.compile(r'[^\w\-]')
+
+# Status report line for each tracked token, filled in with str.format_map
+_TRACKED_TOKEN_TEMPLATE = (
+    "• Token: {token_start}...{token_end}\n"
+    "  → Current P/L: {change:.2f}%\n"
+    "  → Max P/L: {max_change:.2f}%\n"
+    "  → Current SL: {sl_distance:.2f}% from price"
+)
+_REPORT_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# (upper bound in seconds, seconds per unit, unit name) for format_time_elapsed
+_TIME_UNITS = (
+    (60, 1, 'seconds'),
+    (3600, 60, 'minutes'),
+    (86400, 3600, 'hours'),
+    (float('inf'), 86400, 'days')
+)
+
+# Template written by open_env_file when no .env file exists yet
+_ENV_TEMPLATE = b"""# Stratos Trading Bot Configuration
+# You can edit this file directly to change settings
+
+# Telegram API Configuration
+TELEGRAM_API_ID=
+TELEGRAM_API_HASH=
+TELEGRAM_PHONE=
+
+# Channel Configuration
+# Comma-separated list of channel IDs to monitor
+SOURCE_CHANNELS=
+
+# Trading Parameters
+POSITION_SIZE_PERCENT=3
+INITIAL_SL_PERCENT=30
+TRAIL_PERCENT=5
+TAKE_PROFIT_LEVELS=20,40,100
+MAX_SLIPPAGE=15
+GAS_PRIORITY=3
+
+# DEX Settings
+DEX_NAME=PancakeSwap
+CHAIN_NAME=BSC
+
+# Wallet Address (private key is never stored here for security)
+WALLET_ADDRESS=
+
+# Paper Trading Mode (true/false)
+PAPER_TRADING_MODE=true
+
+# Memecoin Safety Settings
+MIN_LIQUIDITY_USD=50000
+MAX_BUY_TAX=10
+MAX_SELL_TAX=15
+HONEYPOT_CHECK=true
+"""
+
+# log_file -> ((mtime_ns, size), stats) of the last successful get_summary_stats run
+_summary_stats_cache = {}
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    File handler that leaves records in the file buffer instead of flushing each one
+    WARNING and above are flushed right away; the rest go out when the buffer fills
+    or the handler is closed at shutdown
+    """
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.WARNING:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+# Background listener started by setup_logging, kept so a repeat call replaces it
+_log_listener = None
+
+def _stop_log_listener():
+    """Stop the logging listener thread, then flush and close its handlers"""
+    global _log_listener
+    listener, _log_listener = _log_listener, None
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+atexit.register(_stop_log_listener)  # Flush queued records on shutdown
+
 def setup_logging(log_file='bot.log', log_level='INFO', log_to_file=True):
     """Setup logging configuration"""
     numeric_level = getattr(logging, log_level.upper(), logging.INFO)
     
     handlers = []
     if log_to_file:
-        handlers.append(logging.FileHandler(log_file))
+        handlers.append(BufferedFileHandler(log_file))
     handlers.append(logging.StreamHandler())
     
+    # Records are formatted by the caller and written by a background thread,
+    # so logging never blocks the event loop on file or console I/O
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    
+    # force replaces handlers set up earlier (e.g. by basicConfig at import), which
+    # would otherwise make this call a no-op and leave the listener without records
     logging.basicConfig(
         level=numeric_level,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=handlers
+        handlers=[logging.handlers.QueueHandler(log_queue)],
+        force=True
     )
     
+    # Drain and close the listener from any previous call
+    global _log_listener
+    _stop_log_listener()
+    _log_listener = listener
+    
     logger.info("Logging initialized")
     
 def clean_channel_id(channel_id):
@@ -36,7 +149,7 @@ def clean_channel_id(channel_id):
     Converts various formats to a consistent format
     """
     # Remove any non-alphanumeric characters except for - and _
-    cleaned = re.sub(r'[^\w\-]', '', str(channel_id))
+    cleaned = _CHANNEL_ID_STRIP_RE.sub('', str(channel_id))
     
     # If it's a numeric ID, return as is
     if cleaned.isdigit():
@@ -50,17 +163,10 @@ def clean_channel_id(channel_id):
 
 def format_time_elapsed(seconds):
     """Format seconds into a readable time string"""
-    if seconds < 60:
-        return f"{seconds:.1f} seconds"
-    elif seconds < 3600:
-        minutes = seconds / 60
-        return f"{minutes:.1f} minutes"
-    elif seconds < 86400:
-        hours = seconds / 3600
-        return f"{hours:.1f} hours"
-    else:
-        days = seconds / 86400
-        return f"{days:.1f} days"
+    for limit, unit_seconds, unit in _TIME_UNITS:
+        if seconds < limit:
+            break
+    return f"{seconds / unit_seconds:.1f} {unit}"
 
 def get_summary_stats(log_file='signal_log.json'):
     """Get summary statistics from the signal log"""
@@ -69,51 +175,71 @@ def get_summary_stats(log_file='signal_log.json'):
             'total_signals': 0,
             'oldest_signal': None,
             'newest_signal': None,
+            'time_span_seconds': None,
             'sources': {}
         }
         
     try:
-        signals = []
+        # Reuse the previous result while the log file is unchanged
+        st = os.stat(log_file)
+        cache_key = (st.st_mtime_ns, st.st_size)
+        cached = _summary_stats_cache.get(log_file)
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+            
+        # Aggregate in a single pass over the file instead of loading every signal
+        total = 0
+        oldest = newest = None
+        oldest_key = newest_key = None
+        sources = {}
         with open(log_file, 'r') as f:
             for line in f:
+                # Blank lines are skipped without going through the JSON parser
+                if line.isspace():
+                    continue
                 try:
-                    signal = json.loads(line.strip())
-                    signals.append(signal)
+                    signal = json.loads(line)
                 except json.JSONDecodeError:
                     continue
-        
-        if not signals:
-            return {
-                'total_signals': 0,
-                'oldest_signal': None,
-                'newest_signal': None,
-                'sources': {}
-            }
-            
-        # Count signals by source
-        sources = {}
-        for signal in signals:
-            source = signal.get('source', 'unknown')
-            if source in sources:
-                sources[source] += 1
-            else:
-                sources[source] = 1
+                    
+                total += 1
+                
+                # Count signals by source
+                source = signal.get('source', 'unknown')
+                sources[source] = sources.get(source, 0) + 1
                 
-        # Sort by timestamp
-        signals.sort(key=lambda x: x.get('timestamp', ''))
+                # Track the oldest and newest signal (ISO timestamps compare as strings)
+                timestamp = signal.get('timestamp')
+                key = timestamp or ''
+                if oldest_key is None or key < oldest_key:
+                    oldest, oldest_key = timestamp, key
+                if newest_key is None or key >= newest_key:
+                    newest, newest_key = timestamp, key
+                    
+        # Work out the span once here so every report built from these stats can reuse it
+        time_span_seconds = None
+        if oldest and newest:
+            try:
+                time_span_seconds = (_parse_timestamp(newest) - _parse_timestamp(oldest)).total_seconds()
+            except (ValueError, TypeError):
+                pass
         
-        return {
-            'total_signals': len(signals),
-            'oldest_signal': signals[0].get('timestamp'),
-            'newest_signal': signals[-1].get('timestamp'),
+        stats = {
+            'total_signals': total,
+            'oldest_signal': oldest,
+            'newest_signal': newest,
+            'time_span_seconds': time_span_seconds,
             'sources': sources
         }
+        _summary_stats_cache[log_file] = (cache_key, stats)
+        return stats
     except Exception as e:
         logger.error(f"Error getting summary stats: {str(e)}")
         return {
             'total_signals': 0,
             'oldest_signal': None,
             'newest_signal': None,
+            'time_span_seconds': None,
             'sources': {},
             'error': str(e)
         }
@@ -124,9 +250,18 @@ def is_valid_token_address(address):
     if not address or not isinstance(address, str):
         return False
         
-    # Check if it's a hexadecimal string of the right length
-    hex_pattern = re.compile(r'^[a-fA-F0-9]{40,}$')
-    return bool(hex_pattern.match(address))
+    return _is_hex_address(address)
+
+@functools.lru_cache(maxsize=4096)
+def _is_hex_address(address):
+    """Check for a hexadecimal string of the right length, cached since the same addresses recur"""
+    # Stripping every hex digit leaves nothing only if all characters are hex
+    return len(address) >= 40 and not address.strip(string.hexdigits)
+
+@functools.lru_cache(maxsize=1024)
+def _parse_timestamp(timestamp):
+    """Parse an ISO timestamp, cached since reports keep parsing the same values"""
+    return datetime.fromisoformat(timestamp)
 
 def generate_status_report(bot, stats=None):
     """Generate a detailed status report"""
@@ -138,7 +273,7 @@ def generate_status_report(bot, stats=None):
     report = [
         "📊 **TELEGRAM COPY TRADING BOT - STATUS REPORT** 📊",
         "",
-        f"📅 Report Time: {now.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"📅 Report Time: {now.strftime(_REPORT_TIME_FORMAT)}",
         "",
         "🤖 **Bot Configuration**",
         f"• Monitoring: {len(bot.config.source_channels)} source channels",
@@ -150,112 +285,88 @@ def generate_status_report(bot, stats=None):
         "📈 **Signal Statistics**",
         f"• Total Signals Copied: {stats['total_signals']}",
     ]
+    append = report.append
     
     # Add time period info if we have signals
     if stats['newest_signal'] and stats['oldest_signal']:
         try:
-            newest = datetime.fromisoformat(stats['newest_signal'])
-            oldest = datetime.fromisoformat(stats['oldest_signal'])
-            time_span = newest - oldest
+            newest = _parse_timestamp(stats['newest_signal'])
+            oldest = _parse_timestamp(stats['oldest_signal'])
+            time_span_seconds = stats.get('time_span_seconds')
+            if time_span_seconds is None:
+                time_span_seconds = (newest - oldest).total_seconds()
             
-            report.extend([
-                f"• First Signal: {oldest.strftime('%Y-%m-%d %H:%M:%S')}",
-                f"• Latest Signal: {newest.strftime('%Y-%m-%d %H:%M:%S')}",
-                f"• Time Span: {format_time_elapsed(time_span.total_seconds())}",
-            ])
+            append(f"• First Signal: {oldest.strftime(_REPORT_TIME_FORMAT)}")
+            append(f"• Latest Signal: {newest.strftime(_REPORT_TIME_FORMAT)}")
+            append(f"• Time Span: {format_time_elapsed(time_span_seconds)}")
         except (ValueError, TypeError):
             pass
     
     # Add source breakdown if available
     if stats['sources']:
-        report.append("")
-        report.append("📋 **Signal Sources**")
-        for source, count in stats['sources'].items():
-            report.append(f"• {source}: {count} signals")
+        append("")
+        append("📋 **Signal Sources**")
+        report.extend(f"• {source}: {count} signals" for source, count in stats['sources'].items())
     
     # Add active tracking info
     if bot.price_tracker and hasattr(bot.price_tracker, 'tracking_signals'):
         active_tracking = len(bot.price_tracker.tracking_signals)
-        report.extend([
-            "",
-            "🔍 **Active Tracking**",
-            f"• Tokens Being Tracked: {active_tracking}"
-        ])
+        append("")
+        append("🔍 **Active Tracking**")
+        append(f"• Tokens Being Tracked: {active_tracking}")
         
         # Add some details about actively tracked tokens
         if active_tracking > 0:
-            report.append("")
-            report.append("🔎 **Currently Tracked Tokens**")
-            for token, info in bot.price_tracker.tracking_signals.items():
-                if not info['sl_triggered']:
-                    entry = info['entry_price']
-                    current = info['current_price']
-                    highest = info['highest_price']
-                    sl = info['current_sl_level']
-                    change = ((current / entry) - 1) * 100
-                    max_change = ((highest / entry) - 1) * 100
-                    
-                    report.extend([
-                        f"• Token: {token[:8]}...{token[-6:]}",
-                        f"  → Current P/L: {change:.2f}%",
-                        f"  → Max P/L: {max_change:.2f}%",
-                        f"  → Current SL: {((sl / current) - 1) * 100:.2f}% from price"
-                    ])
+            append("")
+            append("🔎 **Currently Tracked Tokens**")
+            report.extend(
+                _TRACKED_TOKEN_TEMPLATE.format_map({
+                    'token_start': token[:8],
+                    'token_end': token[-6:],
+                    'change': ((info['current_price'] / info['entry_price']) - 1) * 100,
+                    'max_change': ((info['highest_price'] / info['entry_price']) - 1) * 100,
+                    'sl_distance': ((info['current_sl_level'] / info['current_price']) - 1) * 100
+                })
+                for token, info in bot.price_tracker.tracking_signals.items()
+                if not info['sl_triggered']
+            )
     
     return "\n".join(report)
 
+def _open_with_startfile(path):
+    """Open a file with its default application on Windows"""
+    os.startfile(os.path.abspath(path))
+
+def _open_with_command(command):
+    """Build an opener that runs a system command on the file"""
+    def opener(path):
+        subprocess.run([command, path], check=True)
+    return opener
+
+# Default application opener for this platform, resolved once at import
+_SYSTEM_OPENER = {
+    'Windows': _open_with_startfile,
+    'Darwin': _open_with_command('open'),  # macOS
+}.get(platform.system(), _open_with_command('xdg-open'))  # Linux and other systems
+
 def open_env_file(env_file='.env'):
     """
     Open the .env file in the system's default text editor
     """
     try:
-        # Create .env file with template if it doesn't exist
-        if not os.path.exists(env_file):
-            with open(env_file, 'w') as f:
-                f.write("""# Stratos Trading Bot Configuration
-# You can edit this file directly to change settings
-
-# Telegram API Configuration
-TELEGRAM_API_ID=
-TELEGRAM_API_HASH=
-TELEGRAM_PHONE=
-
-# Channel Configuration
-# Comma-separated list of channel IDs to monitor
-SOURCE_CHANNELS=
-
-# Trading Parameters
-POSITION_SIZE_PERCENT=3
-INITIAL_SL_PERCENT=30
-TRAIL_PERCENT=5
-TAKE_PROFIT_LEVELS=20,40,100
-MAX_SLIPPAGE=15
-GAS_PRIORITY=3
-
-# DEX Settings
-DEX_NAME=PancakeSwap
-CHAIN_NAME=BSC
-
-# Wallet Address (private key is never stored here for security)
-WALLET_ADDRESS=
-
-# Paper Trading Mode (true/false)
-PAPER_TRADING_MODE=true
-
-# Memecoin Safety Settings
-MIN_LIQUIDITY_USD=50000
-MAX_BUY_TAX=10
-MAX_SELL_TAX=15
-HONEYPOT_CHECK=true
-""")
+        # Create .env file with template if it doesn't exist (O_EXCL makes the check and create atomic)
+        try:
+            fd = os.open(env_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass
+        else:
+            try:
+                os.write(fd, _ENV_TEMPLATE)
+            finally:
+                os.close(fd)
             
         # Open the file with system's default application
-        if platform.system() == 'Windows':
-            os.startfile(os.path.abspath(env_file))
-        elif platform.system() == 'Darwin':  # macOS
-            subprocess.run(['open', env_file], check=True)
-        else:  # Linux and other systems
-            subprocess.run(['xdg-open', env_file], check=True)
+        _SYSTEM_OPENER(env_file)
             
         logger.info(f"Opened .env file with system editor: {env_file}")
         return True
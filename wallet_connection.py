@@ -8,12 +8,27 @@ import logging
 import asyncio
 import json
 import os
+import threading
 import time
-import uuid
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Random bytes for simulated IDs and hashes are drawn from the OS in blocks
+# and handed out in slices, rather than one os.urandom call per value
+_RANDOM_BLOCK_SIZE = 4096
+_random_pool = bytearray()
+_random_pool_lock = threading.Lock()
+
+def _random_hex(nbytes):
+    """Return nbytes of random data as a hex string"""
+    with _random_pool_lock:
+        if len(_random_pool) < nbytes:
+            _random_pool.extend(os.urandom(max(_RANDOM_BLOCK_SIZE, nbytes)))
+        chunk = _random_pool[:nbytes]
+        del _random_pool[:nbytes]
+    return chunk.hex()
+
 class ConnectionType(Enum):
     """Types of wallet connections supported"""
     WALLET_CONNECT = "wallet_connect"
@@ -22,6 +37,30 @@ class ConnectionType(Enum):
     HARDWARE = "hardware"
     PRIVATE_KEY = "private_key"  # Only for development/testing
 
+# Log/delay steps simulated while signing, per connection type
+_SIGN_STEPS = {
+    ConnectionType.WALLET_CONNECT: (
+        ("Sending signing request to user's mobile wallet...", 2),
+        ("Waiting for user approval...", 3),
+    ),
+    ConnectionType.METAMASK: (
+        ("Sending request to MetaMask...", 1),
+        ("MetaMask popup opened. Waiting for user approval...", 2),
+    ),
+    ConnectionType.HARDWARE: (
+        ("Sending transaction to hardware wallet...", 1),
+        ("Please review and confirm the transaction on your device...", 3),
+    ),
+    # API keys can usually execute directly without additional signing
+    ConnectionType.API_KEY: (
+        ("Using API authorization to execute transaction...", 1),
+    ),
+    # For private key, we'd sign directly
+    ConnectionType.PRIVATE_KEY: (
+        ("Signing transaction with private key...", 1),
+    ),
+}
+
 class WalletConnection:
     """Handles secure wallet connections for trading"""
     
@@ -34,6 +73,28 @@ class WalletConnection:
         self.private_key = None  # Only stored temporarily in memory, never saved
         self.connection_id = None
         
+        # Simulated wallet/network delays are opt-in so real flows don't pay them
+        self._simulate_delays = getattr(config, 'simulate_delays', False)
+        
+        # Connection handlers by type, resolved with a single lookup
+        self._connect_dispatch = {
+            # WalletConnect protocol doesn't expose private keys
+            ConnectionType.WALLET_CONNECT: self._connect_wallet_connect,
+            # MetaMask integration via browser extension
+            ConnectionType.METAMASK: self._connect_metamask,
+            # Exchange API key connection
+            ConnectionType.API_KEY: self._connect_api,
+            # Hardware wallet connection
+            ConnectionType.HARDWARE: self._connect_hardware,
+            # Direct private key connection - ONLY FOR TESTING
+            ConnectionType.PRIVATE_KEY: self._connect_private_key,
+        }
+        
+    async def _simulate_delay(self, seconds):
+        """Sleep for a simulated delay if simulated delays are enabled"""
+        if self._simulate_delays:
+            await asyncio.sleep(seconds)
+        
     async def connect_wallet(self, connection_type, credentials):
         """
         Connect a wallet using the specified connection type and credentials
@@ -47,39 +108,17 @@ class WalletConnection:
         """
         try:
             self.connection_type = connection_type
-            self.connection_id = str(uuid.uuid4())
+            self.connection_id = _random_hex(16)
             
             logger.info(f"Attempting to connect wallet using {connection_type}")
             
-            if connection_type == ConnectionType.WALLET_CONNECT:
-                # WalletConnect protocol doesn't expose private keys
-                return await self._connect_wallet_connect(credentials)
-                
-            elif connection_type == ConnectionType.METAMASK:
-                # MetaMask integration via browser extension
-                return await self._connect_metamask(credentials)
-                
-            elif connection_type == ConnectionType.API_KEY:
-                # Exchange API key connection
-                return await self._connect_api(credentials)
-                
-            elif connection_type == ConnectionType.HARDWARE:
-                # Hardware wallet connection
-                return await self._connect_hardware(credentials)
-                
-            elif connection_type == ConnectionType.PRIVATE_KEY:
-                # Direct private key connection - ONLY FOR TESTING
-                # NOT RECOMMENDED FOR PRODUCTION
-                if os.environ.get('ENVIRONMENT') != 'development':
-                    logger.error("Direct private key connection not allowed in production")
-                    raise ValueError("Private key connection not allowed in production environment")
-                    
-                return await self._connect_private_key(credentials)
-                
-            else:
+            handler = self._connect_dispatch.get(connection_type)
+            if handler is None:
                 logger.error(f"Unsupported connection type: {connection_type}")
                 return False
                 
+            return await handler(credentials)
+                
         except Exception as e:
             logger.error(f"Error connecting wallet: {str(e)}")
             return False
@@ -94,10 +133,10 @@ class WalletConnection:
             
             # Simulate connection process
             logger.info(f"Generating WalletConnect QR code for wallet {self.wallet_address}")
-            await asyncio.sleep(1)
+            await self._simulate_delay(1)
             
             logger.info("Waiting for user to approve connection in their wallet...")
-            await asyncio.sleep(2)
+            await self._simulate_delay(2)
             
             # Simulate successful connection
             self.connected = True
@@ -119,7 +158,7 @@ class WalletConnection:
             
             # Simulate connection process
             logger.info(f"Requesting MetaMask connection for {self.wallet_address}")
-            await asyncio.sleep(1)
+            await self._simulate_delay(1)
             
             # Simulate successful connection
             self.connected = True
@@ -147,7 +186,7 @@ class WalletConnection:
             
             # Simulate API verification
             logger.info("Verifying API key access...")
-            await asyncio.sleep(1)
+            await self._simulate_delay(1)
             
             # Simulate successful connection
             self.connected = True
@@ -168,10 +207,10 @@ class WalletConnection:
             
             # Simulate detection process
             logger.info("Searching for hardware wallets...")
-            await asyncio.sleep(1)
+            await self._simulate_delay(1)
             
             logger.info(f"Found device. Waiting for user confirmation...")
-            await asyncio.sleep(2)
+            await self._simulate_delay(2)
             
             # Simulate successful connection
             self.connected = True
@@ -189,6 +228,11 @@ class WalletConnection:
         
         WARNING: This method is highly insecure and should only be used for development/testing
         """
+        # NOT RECOMMENDED FOR PRODUCTION
+        if os.environ.get('ENVIRONMENT') != 'development':
+            logger.error("Direct private key connection not allowed in production")
+            raise ValueError("Private key connection not allowed in production environment")
+            
         try:
             # Extract private key and derive address
             private_key = credentials.get('private_key')
@@ -201,12 +245,12 @@ class WalletConnection:
             # In a real implementation, we'd derive the wallet address from the private key
             # For simulation, we'll use the provided address
             self.private_key = private_key
-            self.wallet_address = credentials.get('address', f"0x{uuid.uuid4().hex[:40]}")
+            self.wallet_address = credentials['address'] if 'address' in credentials else f"0x{_random_hex(20)}"
             
             logger.warning("SECURITY RISK: Using direct private key connection")
             
             # Simulate connection process
-            await asyncio.sleep(1)
+            await self._simulate_delay(1)
             
             # Set connected state
             self.connected = True
@@ -233,42 +277,18 @@ class WalletConnection:
             logger.info(f"Preparing to sign transaction using {self.connection_type}")
             
             # Simulate different signing processes based on connection type
-            if self.connection_type == ConnectionType.WALLET_CONNECT:
-                logger.info("Sending signing request to user's mobile wallet...")
-                await asyncio.sleep(2)
-                logger.info("Waiting for user approval...")
-                await asyncio.sleep(3)
-                
-            elif self.connection_type == ConnectionType.METAMASK:
-                logger.info("Sending request to MetaMask...")
-                await asyncio.sleep(1)
-                logger.info("MetaMask popup opened. Waiting for user approval...")
-                await asyncio.sleep(2)
-                
-            elif self.connection_type == ConnectionType.HARDWARE:
-                logger.info("Sending transaction to hardware wallet...")
-                await asyncio.sleep(1)
-                logger.info("Please review and confirm the transaction on your device...")
-                await asyncio.sleep(3)
-                
-            elif self.connection_type == ConnectionType.API_KEY:
-                # API keys can usually execute directly without additional signing
-                logger.info("Using API authorization to execute transaction...")
-                await asyncio.sleep(1)
-                
-            elif self.connection_type == ConnectionType.PRIVATE_KEY:
-                # For private key, we'd sign directly
-                logger.info("Signing transaction with private key...")
-                await asyncio.sleep(1)
+            for message, delay in _SIGN_STEPS.get(self.connection_type, ()):
+                logger.info(message)
+                await self._simulate_delay(delay)
                 
             # Generate a simulated transaction hash
-            tx_hash = f"0x{uuid.uuid4().hex}"
+            tx_hash = f"0x{_random_hex(16)}"
             logger.info(f"Transaction signed. TX hash: {tx_hash}")
             
             return {
                 'success': True,
                 'tx_hash': tx_hash,
-                'signed_data': f"0x{uuid.uuid4().hex}"
+                'signed_data': f"0x{_random_hex(16)}"
             }
             
         except Exception as e:
@@ -290,7 +310,7 @@ class WalletConnection:
             if self.connection_type == ConnectionType.WALLET_CONNECT:
                 # Close WalletConnect session
                 logger.info("Closing WalletConnect session...")
-                await asyncio.sleep(1)
+                await self._simulate_delay(1)
                 
             # Clear sensitive data
             self.private_key = None